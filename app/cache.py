@@ -0,0 +1,64 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Szálbiztos, méretkorlátos gyorsítótár opcionális lejárati idővel
+
+    Megteléskor a legrégebben használt elem kerül ki; lejárt elemet
+    a get nem ad vissza.
+    """
+    def __init__(self, max_entries, ttl_seconds=None):
+        """
+        :param max_entries: Tárolt elemek legnagyobb száma (0: nincs gyorsítótárazás)
+        :param ttl_seconds: Egy elem élettartama másodpercben (None: nem jár le)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        :param key: Kulcs (hashelhető)
+        :return: A tárolt érték, vagy None ha nincs (vagy lejárt)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl_seconds is None or time.monotonic() - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        :param key: Kulcs (hashelhető)
+        :param value: Tárolandó érték (nem lehet None)
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        :return: Találatok, tévesztések és a tárolt elemek száma
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries)
+            }
@@ -0,0 +1,192 @@
+import time
+import threading
+
+
+def normalize_question(question):
+    """
+    Kérdés normalizálása összevonási kulcshoz (kisbetűsítés, szóközök egységesítése)
+
+    :param question: Felhasználói kérdés
+    :return: Normalizált kérdés szöveg
+    """
+    return " ".join(question.split()).casefold()
+
+
+class AdmissionRejected(Exception):
+    """
+    A kérés nem kapott helyet a korlátozott erőforráson
+    """
+    def __init__(self, message, status_code, retry_after):
+        """
+        :param message: Hibaüzenet
+        :param status_code: Javasolt HTTP státuszkód (429: teli sor, 503: lejárt határidő)
+        :param retry_after: Javasolt újrapróbálkozási idő másodpercben
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(AdmissionRejected):
+    """
+    A kérés határideje a feldolgozás közben járt le (503)
+    """
+
+
+class _InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Azonos kulcsú, egyidejű hívások összevonása (singleflight)
+
+    Az első hívó végzi a számítást, a közben érkező azonos kulcsú hívók
+    megvárják (legfeljebb a saját határidejükig) és ugyanazt az eredményt
+    (vagy kivételt) kapják.
+    """
+    def __init__(self, retry_after=1):
+        """
+        :param retry_after: Határidő túllépésekor javasolt újrapróbálkozási idő (mp)
+        """
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+        self.timed_out = 0
+
+    def do(self, key, fn, deadline=None):
+        """
+        Függvény futtatása, vagy csatlakozás a már futó azonos kulcsú híváshoz
+
+        :param key: Összevonási kulcs (hashelhető)
+        :param fn: Argumentum nélküli függvény
+        :param deadline: A csatlakozó hívó határideje time.monotonic() szerint (None: nincs)
+        :return: A függvény eredménye
+        :raises DeadlineExceeded: Ha a futó hívás nem végzett a határidőig
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not call.done.wait(timeout):
+                with self._lock:
+                    self.timed_out += 1
+                raise DeadlineExceeded("A kérés határideje lejárt az azonos kérdés megvárása közben",
+                                       503, self.retry_after)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """
+        :return: Végrehajtott és összevont hívások száma, valamint a futó hívások száma
+        """
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "timed_out": self.timed_out,
+                "in_flight": len(self._calls)
+            }
+
+
+class AdmissionController:
+    """
+    Beengedés-szabályozás: legfeljebb max_concurrent egyidejű futás,
+    legfeljebb max_queue várakozó; a többi kérés azonnal elutasításra kerül
+    """
+    def __init__(self, max_concurrent, max_queue, retry_after):
+        """
+        :param max_concurrent: Egyidejűleg futó műveletek legnagyobb száma
+        :param max_queue: Várakozó kérések legnagyobb száma
+        :param retry_after: Elutasításkor javasolt újrapróbálkozási idő (mp)
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_deadline = 0
+
+    def acquire(self, deadline=None):
+        """
+        Hely foglalása, szükség esetén várakozással a határidőig
+
+        :param deadline: Abszolút határidő time.monotonic() szerint (None: nincs)
+        :raises AdmissionRejected: Teli várakozási sor vagy lejárt határidő esetén
+        """
+        with self._cond:
+            if deadline is not None and deadline <= time.monotonic():
+                self.rejected_deadline += 1
+                raise AdmissionRejected("A kérés határideje lejárt", 503, self.retry_after)
+            if self._active < self.max_concurrent and self._waiting == 0:
+                self._active += 1
+                self.admitted += 1
+                return
+            if self._waiting >= self.max_queue:
+                self.rejected_queue_full += 1
+                raise AdmissionRejected("A várakozási sor megtelt", 429, self.retry_after)
+
+            self._waiting += 1
+            try:
+                while self._active >= self.max_concurrent:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.rejected_deadline += 1
+                        # Az esetleg nekünk szánt ébresztést továbbadjuk
+                        self._cond.notify()
+                        raise AdmissionRejected("A kérés határideje lejárt várakozás közben", 503, self.retry_after)
+                    self._cond.wait(remaining)
+                self._active += 1
+                self.admitted += 1
+            finally:
+                self._waiting -= 1
+
+    def release(self):
+        """
+        Foglalt hely felszabadítása
+        """
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def stats(self):
+        """
+        :return: Aktív és várakozó kérések száma, valamint a beengedési számlálók
+        """
+        with self._cond:
+            return {
+                "active": self._active,
+                "waiting": self._waiting,
+                "admitted": self.admitted,
+                "rejected_queue_full": self.rejected_queue_full,
+                "rejected_deadline": self.rejected_deadline
+            }
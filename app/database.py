@@ -1,35 +1,150 @@
 import os
+import json
+import hashlib
 import logging
 import sys
 import time
+import itertools
+import threading
 import subprocess
-from pathlib import Path
 from typing import List, Optional
 
-from langchain_community.document_loaders import TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 import chromadb
+from chromadb.api.client import SharedSystemClient
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 from langchain_core.documents import Document
 
+from cache import LRUCache
+from file_scanner import SourceScanner
+from source_reader import UnreadableSource, iter_text_pieces, read_text
+from lexical_index import LexicalIndex
+from logging_setup import configure_logging
+from snapshot import SnapshotError, read_snapshot, write_snapshot
+
+# Beágyazó modell neve
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+# Egy encode hívásban beágyazott chunkok száma
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))
+# Beágyazó worker processzek száma betöltéskor (0 vagy 1: egyprocesszes mód)
+EMBEDDING_PROCESSES = int(os.getenv('EMBEDDING_PROCESSES', '0'))
+# Ennél kevesebb chunk esetén nem éri meg a processzkészlet elindítása
+EMBEDDING_MULTIPROCESS_MIN_CHUNKS = int(os.getenv('EMBEDDING_MULTIPROCESS_MIN_CHUNKS', '256'))
+# Gyorsítótárazott lekérdezés beágyazások száma (előtöltés és ismételt kérdések)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', '1024'))
+# Betöltött fájlkiterjesztések
+TEXT_EXTENSIONS = ["py", "java", "md", "txt", "json"]
+# Ennél nagyobb forrásfájlokat a bejárás kihagy (bájt)
+MAX_SOURCE_FILE_SIZE = int(os.getenv('MAX_SOURCE_FILE_SIZE', str(20 * 1024 * 1024)))
+# Kiterjesztésenkénti méretkorlátok ("json=2097152,md=5242880"), felülírják a fentit
+SOURCE_SIZE_LIMITS = os.getenv('SOURCE_SIZE_LIMITS', 'json=5242880')
+# Ennél nagyobb fájlok darabokban, memóriába leképezve kerülnek a darabolóhoz (bájt)
+STREAMING_THRESHOLD_BYTES = int(os.getenv('STREAMING_THRESHOLD_BYTES', str(1024 * 1024)))
+# Egy beolvasott darab mérete nagy fájlok esetén (bájt)
+STREAMING_PIECE_BYTES = int(os.getenv('STREAMING_PIECE_BYTES', str(256 * 1024)))
+# Chunkolási beállítások
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# A tárolt metaadatok sémájának verziója (pillanatkép kompatibilitáshoz)
+INDEX_SCHEMA_VERSION = 3
+# Keresési mód: 'hybrid' (lexikális + vektoros) vagy 'vector'
+RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'hybrid')
+# Ha a lekérdezés azonosítóinak legalább ekkora része pontos szimbólum találat,
+# a keresés csak a lexikális indexet használja (nincs embedding)
+LEXICAL_FAST_PATH_RATIO = float(os.getenv('LEXICAL_FAST_PATH_RATIO', '0.5'))
+# Hibrid rangsoroláskor mindkét forrásból k * ennyi jelöltet veszünk
+HYBRID_CANDIDATE_FACTOR = 3
+# Reciprocal Rank Fusion konstans
+RRF_K = 60
+# Egy collection.add hívásban beírt chunkok száma
+COLLECTION_ADD_BATCH_SIZE = 500
+
+# Forrásfájl tartalom hash-elésekor egyszerre olvasott bájtok
+FILE_HASH_BLOCK_BYTES = 1024 * 1024
+# Az olvashatatlan (bináris, nem UTF-8) forrásfájlok jegyzéke az index mellett
+UNREADABLE_FILES_NAME = 'unreadable_files.json'
+# Folyamatszintű index verziók: egy kiürített és újranyitott projekt sem kaphat
+# korábbi verziót, így a verzióval kulcsolt gyorsítótárak nem keverednek
+_INDEX_VERSIONS = itertools.count(1)
+
+
+def _shared_system_cache(identifier, system):
+    """
+    A ChromaDB folyamatszintű rendszer-gyorsítótárának megkeresése
+    
+    A gyorsítótár a SharedSystemClient privát osztályattribútuma, a neve
+    verziónként eltér (a 0.4.x sorozatban elírva), ezért név helyett azt
+    a szótárat keressük, amelyik az adott azonosítóhoz ezt a rendszert tárolja.
+    
+    :param identifier: A kliens azonosítója (perzisztens kliensnél az útvonal)
+    :param system: A kliens ChromaDB rendszere
+    :return: A gyorsítótár szótár, vagy None ha a rendszer nincs benne
+    """
+    for value in vars(SharedSystemClient).values():
+        if isinstance(value, dict) and value.get(identifier) is system:
+            return value
+    return None
+
 class HuggingFaceEmbeddingsAdapter:
     """
     Adapter osztály a SentenceTransformer és LangChain kompatibilitás biztosításához
     """
     def __init__(self, model_name):
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
+        # A lekérdezések vektora csak a szövegtől függ, így index változáskor is érvényes
+        self.query_cache = LRUCache(QUERY_EMBEDDING_CACHE_SIZE)
     
-    def embed_documents(self, texts):
+    def embed_documents(self, texts, batch_size=EMBEDDING_BATCH_SIZE):
         """
         Dokumentumok beágyazása vektorokká
         
         :param texts: Dokumentum szövegek listája
+        :param batch_size: Egy encode lépésben feldolgozott szövegek száma
         :return: Beágyazott vektorok listája
         """
         if isinstance(texts, str):
             texts = [texts]
-        return self.model.encode(texts, convert_to_tensor=False).tolist()
+        return self.model.encode(texts, batch_size=batch_size, convert_to_tensor=False).tolist()
+    
+    def embed_documents_multiprocess(self, texts, processes, batch_size=EMBEDDING_BATCH_SIZE):
+        """
+        Dokumentumok beágyazása több worker processzel
+        
+        Minden worker saját modell példányt tölt be, a chunk csomagokat
+        a SentenceTransformer processzkészlete osztja szét. A kimenet sorrendje
+        megegyezik a bemenetével. A készlet a hívás végén mindig leáll.
+        
+        :param texts: Dokumentum szövegek listája
+        :param processes: Worker processzek száma
+        :param batch_size: Egy encode lépésben feldolgozott szövegek száma
+        :return: Beágyazott vektorok listája
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        pool = self.model.start_multi_process_pool(target_devices=['cpu'] * processes)
+        try:
+            embeddings = self.model.encode_multi_process(texts, pool, batch_size=batch_size)
+        finally:
+            self.model.stop_multi_process_pool(pool)
+        return embeddings.tolist()
+    
+    def embed_queries(self, texts):
+        """
+        Lekérdezések beágyazása gyorsítótárral; csak a hiányzók kerülnek a modellhez
+        
+        :param texts: Lekérdezés szövegek listája
+        :return: Beágyazott vektorok listája a bemenet sorrendjében
+        """
+        embeddings = [self.query_cache.get(text) for text in texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = self.embed_documents([texts[i] for i in missing])
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+                self.query_cache.put(texts[i], embedding)
+        return embeddings
     
     def embed_query(self, text):
         """
@@ -41,13 +156,19 @@ class HuggingFaceEmbeddingsAdapter:
         return self.model.encode(text, convert_to_tensor=False).tolist()
 
 class DocumentDatabase:
-    def __init__(self, source_dir, db_dir):
+    def __init__(self, source_dir, db_dir, collection_name="documents", embeddings=None):
         """
         Dokumentum adatbázis inicializálása
         
         :param source_dir: Forrás dokumentumok könyvtára
         :param db_dir: Adatbázis tárolási könyvtár
+        :param collection_name: A ChromaDB collection neve
+        :param embeddings: Megosztott embedding adapter (hiányában saját modell töltődik be)
         """
+        # Naplózás beállítása (egyszeri, a további példányok a meglévőt használják)
+        configure_logging()
+        self.logger = logging.getLogger(__name__)
+        
         # Könyvtárak létrehozása szükség esetén sudo jogosultsággal
         os.makedirs(source_dir, exist_ok=True)
         self._ensure_directory_with_permissions(db_dir)
@@ -55,28 +176,20 @@ class DocumentDatabase:
         
         self.source_dir = source_dir
         self.db_dir = db_dir
-        
-        # Naplózás beállítása
-        log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs')
-        log_file = os.path.join(log_dir, 'database.log')
-        
-        # Log könyvtár létrehozása
-        os.makedirs(log_dir, exist_ok=True)
-        
-        # Logger létrehozása a basicConfig előtt
-        self.logger = logging.getLogger(__name__)
-        
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            filename=log_file,
-            filemode='a'
-        )
-        
-        # Konzol kimenet hozzáadása
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.DEBUG)
-        self.logger.addHandler(console_handler)
+        self.collection_name = collection_name
+        self.scanner = self._create_scanner(source_dir)
+        # Az index tartalmának változásakor új, folyamaton belül egyedi verziószám
+        self.index_version = next(_INDEX_VERSIONS)
+        # Az utolsó betöltés statisztikái (deduplikáció, beágyazási idő)
+        self.last_ingest_stats = {}
+        # Betöltéskor olvashatatlannak talált fájlok (relatív út -> módosítási idő és
+        # tartalom hash), az index mellett tárolva, hogy újranyitáskor se okozzanak újraépítést
+        self.unreadable_files = self._load_unreadable_files()
+        # Lexikális (BM25) index a vektoros index mellett, első használatkor épül
+        self.lexical_index = None
+        self._lexical_lock = threading.Lock()
+        # A gyorsítótárból leválasztott ChromaDB rendszer (a close állítja le)
+        self._detached_system = None
         
         # Bővített diagnosztikai információk
         self.logger.info(f"Forrás könyvtár: {source_dir}")
@@ -94,18 +207,11 @@ class DocumentDatabase:
             self.logger.error(self._get_traceback())
             raise
         
-        # Embedding modell inicializálása
-        try:
-            # Figyelmeztető üzenet kezelése
-            sys.stderr = open(os.devnull, 'w')  # Elnyeljük a deprecation warning-ot
-            self.embeddings = HuggingFaceEmbeddingsAdapter(model_name="all-MiniLM-L6-v2")
-            sys.stderr = sys.__stderr__  # Visszaállítjuk a szabványos hibakimenetet
-            
-            self.logger.info("Embedding modell sikeresen inicializálva")
-        except Exception as e:
-            self.logger.error(f"Embedding modell inicializálási hiba: {e}")
-            self.logger.error(self._get_traceback())
-            raise
+        # Embedding modell inicializálása (vagy a megosztott példány használata)
+        if embeddings is not None:
+            self.embeddings = embeddings
+        else:
+            self._load_embeddings()
         
         # ChromaDB konfigurálása
         try:
@@ -136,6 +242,54 @@ class DocumentDatabase:
             self.logger.error(self._get_traceback())
             raise
 
+    def _load_embeddings(self):
+        """
+        Saját embedding modell betöltése
+        """
+        try:
+            # Figyelmeztető üzenet kezelése
+            sys.stderr = open(os.devnull, 'w')  # Elnyeljük a deprecation warning-ot
+            self.embeddings = HuggingFaceEmbeddingsAdapter(model_name=EMBEDDING_MODEL_NAME)
+            sys.stderr = sys.__stderr__  # Visszaállítjuk a szabványos hibakimenetet
+            
+            self.logger.info("Embedding modell sikeresen inicializálva")
+        except Exception as e:
+            self.logger.error(f"Embedding modell inicializálási hiba: {e}")
+            self.logger.error(self._get_traceback())
+            raise
+
+    def _create_scanner(self, source_dir):
+        """
+        Forrás könyvtár bejáró létrehozása a betöltési beállításokkal
+        
+        :param source_dir: Forrás könyvtár
+        :return: SourceScanner példány
+        """
+        return SourceScanner(
+            source_dir,
+            TEXT_EXTENSIONS,
+            max_file_size=MAX_SOURCE_FILE_SIZE,
+            size_limits=self._parse_size_limits(SOURCE_SIZE_LIMITS)
+        )
+
+    def _parse_size_limits(self, spec):
+        """
+        Kiterjesztésenkénti méretkorlátok feldolgozása
+        
+        :param spec: "ext=bájt,ext2=bájt" formájú szöveg
+        :return: Szótár: kiterjesztés -> méretkorlát
+        """
+        limits = {}
+        for item in spec.split(','):
+            if '=' not in item:
+                continue
+            ext, limit = (part.strip() for part in item.split('=', 1))
+            try:
+                limits[ext.lstrip('.').lower()] = int(limit)
+            except ValueError:
+                self.logger.warning(f"Érvénytelen méretkorlát figyelmen kívül hagyva: {item}")
+        return limits
+
     def _ensure_directory_with_permissions(self, directory):
         """
         Könyvtár létrehozása szükség esetén sudo jogosultsággal
@@ -195,6 +349,84 @@ class DocumentDatabase:
                 self.logger.error(f"Írási jogosultság hiba továbbra is fennáll: {e2}")
                 raise
 
+    def _unreadable_files_path(self):
+        return os.path.join(self.db_dir, UNREADABLE_FILES_NAME)
+
+    def _load_unreadable_files(self):
+        """
+        :return: A tárolt olvashatatlan fájlok jegyzéke (relatív út -> {modified_time, file_hash})
+        """
+        try:
+            with open(self._unreadable_files_path(), encoding='utf8') as f:
+                unreadable_files = json.load(f)
+            return unreadable_files if isinstance(unreadable_files, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_unreadable_files(self):
+        """
+        Az olvashatatlan fájlok jegyzékének kiírása az index mellé
+        """
+        try:
+            with open(self._unreadable_files_path(), 'w', encoding='utf8') as f:
+                json.dump(self.unreadable_files, f, ensure_ascii=False)
+        except OSError as e:
+            self.logger.warning(f"Olvashatatlan fájlok jegyzéke nem írható: {e}")
+
+    @staticmethod
+    def _file_hash(path):
+        """
+        Forrásfájl tartalmának hash-e
+        
+        :param path: Fájl útvonala
+        :return: Hexadecimális sha1 hash, vagy None ha a fájl nem olvasható
+        """
+        digest = hashlib.sha1()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(FILE_HASH_BLOCK_BYTES), b''):
+                    digest.update(block)
+        except OSError:
+            return None
+        return digest.hexdigest()
+
+    def _source_unchanged(self, source_file, modified_time, file_hash):
+        """
+        Változatlan-e a forrásfájl a tároláskor rögzített állapothoz képest
+        
+        Más gépen vagy friss checkoutban (pl. pillanatképből betöltött index
+        esetén) minden módosítási idő eltér, ilyenkor a tartalom hash dönt.
+        
+        :param source_file: A fájl aktuális SourceFile adatai
+        :param modified_time: Tárolt módosítási idő
+        :param file_hash: Tárolt tartalom hash (None: nincs rögzítve)
+        :return: True ha a fájl tartalma nem változott
+        """
+        if modified_time == source_file.mtime:
+            return True
+        return file_hash is not None and file_hash == self._file_hash(source_file.path)
+
+    def _unchanged_unreadable(self, source_file):
+        """
+        :param source_file: A fájl aktuális SourceFile adatai
+        :return: True ha a fájl a legutóbbi betöltéskor olvashatatlan volt és azóta nem változott
+        """
+        marker = self.unreadable_files.get(source_file.relpath)
+        if not isinstance(marker, dict):
+            return False
+        return self._source_unchanged(source_file, marker.get('modified_time'), marker.get('file_hash'))
+
+    def _mark_unreadable(self, source_file):
+        """
+        Kihagyott fájl feljegyzése (ha a tartalma sem olvasható, hash nélkül)
+        
+        :param source_file: A fájl SourceFile adatai
+        """
+        self.unreadable_files[source_file.relpath] = {
+            "modified_time": source_file.mtime,
+            "file_hash": self._file_hash(source_file.path)
+        }
+
     def _get_traceback(self):
         """
         Aktuális stack trace lekérése hibakereséshez
@@ -215,18 +447,22 @@ class DocumentDatabase:
             # Ellenőrizzük, hogy létezik-e az adatbázis
             collection_exists = False
             try:
-                self.chroma_client.get_collection(name="documents")
+                self.chroma_client.get_collection(name=self.collection_name)
                 collection_exists = True
             except Exception as e:
                 self.logger.info(f"Collection nem létezik: {e}")
                 collection_exists = False
                 
-            # Jelenlegi dokumentumok listázása
-            current_files = self.list_documents()
-            current_file_timestamps = {}
-            for filepath in current_files:
-                full_path = os.path.join(self.source_dir, filepath)
-                current_file_timestamps[filepath] = os.path.getmtime(full_path)
+            # Jelenlegi dokumentumok és módosítási idejük egyetlen bejárásból
+            # A változatlan, legutóbb kihagyott (olvashatatlan) fájlok egyik oldalon sem
+            # számítanak: egy darabolva olvasott fájl hiba előtti chunkjai az indexben lehetnek
+            current_files = {}
+            unreadable_paths = set()
+            for f in self.scanner.scan(validate_files=True):
+                if self._unchanged_unreadable(f):
+                    unreadable_paths.add(f.relpath)
+                else:
+                    current_files[f.relpath] = f
                 
             # Ha nem létezik az adatbázis, létrehozzuk
             if not collection_exists:
@@ -237,27 +473,32 @@ class DocumentDatabase:
             if collection_exists:
                 try:
                     # Collection lekérése
-                    collection = self.chroma_client.get_collection(name="documents")
+                    collection = self.chroma_client.get_collection(name=self.collection_name)
                     
                     # Metaadatok lekérése a fájltípusok ellenőrzéséhez
                     metadata = collection.get(include=["metadatas"])
                     stored_files = {}
                     
-                    # Timestamp-ek kinyerése a metaadatokból
+                    # Timestamp-ek és tartalom hash-ek kinyerése a metaadatokból
                     if metadata and 'metadatas' in metadata:
                         for meta in metadata['metadatas']:
-                            if meta and 'filepath' in meta and 'modified_time' in meta:
-                                stored_files[meta['filepath']] = meta['modified_time']
+                            for reference in self.chunk_references(meta):
+                                if 'filepath' in reference and 'modified_time' in reference:
+                                    stored_files[reference['filepath']] = (
+                                        reference['modified_time'], reference.get('file_hash')
+                                    )
+                    for filepath in unreadable_paths:
+                        stored_files.pop(filepath, None)
                     
                     # Változások ellenőrzése
                     files_changed = False
-                    for filepath, timestamp in current_file_timestamps.items():
-                        if filepath not in stored_files or stored_files[filepath] != timestamp:
+                    for filepath, source_file in current_files.items():
+                        if filepath not in stored_files or not self._source_unchanged(source_file, *stored_files[filepath]):
                             files_changed = True
                             break
                     
                     # Törölt fájlok ellenőrzése
-                    if len(stored_files) != len(current_file_timestamps):
+                    if len(stored_files) != len(current_files):
                         files_changed = True
                         
                     # Adatbázis frissítése, ha változás történt
@@ -278,42 +519,61 @@ class DocumentDatabase:
             self.logger.error(self._get_traceback())
             return False
 
-    def _load_documents(self) -> List[Document]:
+    def _load_documents(self, load_stats):
         """
         Dokumentumok betöltése a forrás könyvtárból
         
-        :return: Betöltött dokumentumok listája
+        Bináris, nem UTF-8 és olvasási hibás fájlokat kihagy (és feljegyez), a
+        STREAMING_THRESHOLD_BYTES-nál nagyobb fájlokat darabonként (átfedéssel)
+        adja tovább, így egy nagy fájl nyers tartalma sosem kerül egyben a
+        memóriába. A belőlük képzett chunkokat a hívó a beágyazásig megtartja.
+        
+        :param load_stats: Kitöltendő szótár: files, streamed_files, skipped_files
+        :return: Generátor: Document objektumok
         """
         self.logger.info(f"Dokumentumok betöltése innen: {self.source_dir}")
         
-        text_extensions = ["py", "java", "md", "txt", "json"]
-        self.logger.info(f"Támogatott kiterjesztések: {text_extensions}")
+        self.logger.info(f"Támogatott kiterjesztések: {TEXT_EXTENSIONS}")
         
-        documents = []
+        source_files = self.scanner.scan(validate_files=True)
+        skipped = list(self.scanner.skipped)
+        load_stats.update(files=0, streamed_files=0, skipped_files=[])
+        self.unreadable_files = {}
         
-        for root, dirs, files in os.walk(self.source_dir):
-            self.logger.info(f"Vizsgált könyvtár: {root}")
-            self.logger.info(f"Talált fájlok: {files}")
-            
-            for file in files:
-                file_path = os.path.join(root, file)
-                ext = file.split('.')[-1].lower()
-                if ext in text_extensions:
-                    try:
-                        loader = TextLoader(file_path, encoding='utf8')
-                        docs = loader.load()
-                        documents.extend(docs)
-                        self.logger.info(f"Sikeresen betöltve: {file_path}")
-                    except Exception as e:
-                        self.logger.error(f"Hiba a fájl betöltése közben {file_path}: {e}")
-                        self.logger.error(self._get_traceback())
+        for source_file in source_files:
+            try:
+                if source_file.size > STREAMING_THRESHOLD_BYTES:
+                    pieces = iter_text_pieces(source_file.path, STREAMING_PIECE_BYTES, CHUNK_OVERLAP)
+                    for piece_index, text in pieces:
+                        yield Document(page_content=text,
+                                       metadata={"source": source_file.path, "piece": piece_index})
+                    load_stats["streamed_files"] += 1
+                else:
+                    yield Document(page_content=read_text(source_file.path),
+                                   metadata={"source": source_file.path})
+                load_stats["files"] += 1
+                self.logger.debug(f"Sikeresen betöltve: {source_file.path}")
+            except UnreadableSource as e:
+                skipped.append((source_file.relpath, str(e)))
+                self._mark_unreadable(source_file)
+            except Exception as e:
+                self.logger.error(f"Hiba a fájl betöltése közben {source_file.path}: {e}")
+                self.logger.error(self._get_traceback())
+                skipped.append((source_file.relpath, 'olvasási hiba'))
+                # Változatlan állapotban a frissesség-ellenőrzés se építsen újra miatta
+                self._mark_unreadable(source_file)
         
-        self.logger.info(f"Összes betöltött dokumentum száma: {len(documents)}")
+        for relpath, reason in skipped:
+            self.logger.warning(f"Kihagyott fájl ({reason}): {relpath}")
+        load_stats["skipped_files"] = [{"filepath": relpath, "reason": reason} for relpath, reason in skipped]
         
-        if len(documents) == 0:
-            self.logger.warning(f"Nem találhatók dokumentumok a következő könyvtárban: {self.source_dir}")
+        self.logger.info(
+            f"Összes betöltött fájl: {load_stats['files']} "
+            f"(ebből darabolva olvasott: {load_stats['streamed_files']}, kihagyott: {len(skipped)})"
+        )
         
-        return documents
+        if load_stats["files"] == 0:
+            self.logger.warning(f"Nem találhatók dokumentumok a következő könyvtárban: {self.source_dir}")
 
     def setup_database(self):
         """
@@ -322,17 +582,20 @@ class DocumentDatabase:
         :return: Művelet sikeressége
         """
         try:
-            # Dokumentumok betöltése
-            documents = self._load_documents()
+            # Dokumentumok betöltése és felosztása fájlonként (darabonként)
+            load_start = time.perf_counter()
+            load_stats = {}
+            text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+            chunks = []
+            for document in self._load_documents(load_stats):
+                chunks.extend(text_splitter.split_documents([document]))
+            load_seconds = time.perf_counter() - load_start
             
-            if not documents:
+            if not chunks:
                 self.logger.warning("Nem találhatók dokumentumok a feldolgozáshoz")
+                self.last_ingest_stats = dict(load_stats, chunks=0)
                 return False
             
-            # Dokumentumok felosztása
-            text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-            chunks = text_splitter.split_documents(documents)
-            
             self.logger.info(f"Dokumentumok felosztva {len(chunks)} darabra")
             
             # Meglévő adatbázis törlése
@@ -340,43 +603,116 @@ class DocumentDatabase:
             
             # Új Collection létrehozása
             try:
-                collection = self.chroma_client.get_or_create_collection(name="documents")
+                collection = self.chroma_client.get_or_create_collection(name=self.collection_name)
                 self.logger.info("Collection sikeresen létrehozva vagy megnyitva")
             except Exception as e:
                 self.logger.error(f"Collection létrehozási hiba: {e}")
                 self.logger.error(self._get_traceback())
                 return False
             
-            # Dokumentumok hozzáadása
+            # Módosítási idők a betöltéskor használt bejárásból, tartalom hash-ek fájlonként egyszer
+            source_mtimes = {f.path: f.mtime for f in self.scanner.scan()}
+            source_hashes = {}
+            
+            # Chunkok és metaadatok előkészítése; az azonos (normalizált) tartalmú
+            # chunkokat egyszer tároljuk, az összes forrás hivatkozásával
+            ids = []
+            texts = []
+            metadatas = []
+            references = []
+            unique_by_hash = {}
+            duplicate_chars = 0
             for i, chunk in enumerate(chunks):
-                try:
-                    # Forrásfájl információk lekérése
-                    source_path = chunk.metadata.get('source') if hasattr(chunk, 'metadata') else None
-                    if source_path:
-                        filepath = os.path.relpath(source_path, self.source_dir)
+                # Forrásfájl információk lekérése
+                source_path = chunk.metadata.get('source') if hasattr(chunk, 'metadata') else None
+                if source_path:
+                    filepath = os.path.relpath(source_path, self.source_dir)
+                    modified_time = source_mtimes.get(source_path)
+                    if modified_time is None:
                         modified_time = os.path.getmtime(source_path)
-                    else:
-                        filepath = f"chunk_{i}"
-                        modified_time = time.time()
-                        
-                    # Embedding előállítása 
-                    embedding = self.embeddings.embed_documents([chunk.page_content])[0]
-                    
-                    # Dokumentum hozzáadása metaadatokkal
+                    if source_path not in source_hashes:
+                        source_hashes[source_path] = self._file_hash(source_path)
+                    file_hash = source_hashes[source_path]
+                else:
+                    filepath = f"chunk_{i}"
+                    modified_time = time.time()
+                    file_hash = None
+                reference = {"filepath": filepath, "chunk_index": i, "modified_time": modified_time}
+                if file_hash is not None:
+                    reference["file_hash"] = file_hash
+                
+                content_hash = self._chunk_hash(chunk.page_content)
+                unique_index = unique_by_hash.get(content_hash)
+                if unique_index is not None:
+                    references[unique_index].append(reference)
+                    duplicate_chars += len(chunk.page_content)
+                    continue
+                
+                unique_by_hash[content_hash] = len(ids)
+                ids.append(f"chunk_{content_hash}")
+                texts.append(chunk.page_content)
+                references.append([reference])
+                metadatas.append({
+                    "filepath": filepath,
+                    "modified_time": modified_time,
+                    "chunk_index": i,
+                    "extension": filepath.rsplit('.', 1)[-1].lower() if '.' in filepath else ""
+                })
+            
+            for metadata, chunk_references in zip(metadatas, references):
+                metadata["duplicate_count"] = len(chunk_references)
+                metadata["references"] = json.dumps(chunk_references)
+            
+            # Embeddingek előállítása csomagokban
+            try:
+                embed_start = time.perf_counter()
+                embeddings = self._embed_chunks(texts)
+                embed_seconds = time.perf_counter() - embed_start
+            except Exception as e:
+                self.logger.error(f"Embedding előállítási hiba: {e}")
+                self.logger.error(self._get_traceback())
+                return False
+            
+            # Dokumentumok hozzáadása metaadatokkal
+            for start in range(0, len(ids), COLLECTION_ADD_BATCH_SIZE):
+                end = start + COLLECTION_ADD_BATCH_SIZE
+                try:
                     collection.add(
-                        ids=[f"doc_{i}"],
-                        embeddings=[embedding],
-                        documents=[chunk.page_content],
-                        metadatas=[{
-                            "filepath": filepath,
-                            "modified_time": modified_time,
-                            "chunk_index": i
-                        }]
+                        ids=ids[start:end],
+                        embeddings=embeddings[start:end],
+                        documents=texts[start:end],
+                        metadatas=metadatas[start:end]
                     )
                 except Exception as e:
-                    self.logger.error(f"Dokumentum hozzáadási hiba (index {i}): {e}")
-                    self.logger.error(f"Chunk tartalma: {chunk.page_content[:100]}...")
+                    self.logger.error(f"Dokumentum hozzáadási hiba (index {start}-{min(end, len(ids)) - 1}): {e}")
+                    self.logger.error(f"Első chunk tartalma: {texts[start][:100]}...")
+            
+            # Lexikális index építése ugyanazokból a chunkokból
+            lexical_start = time.perf_counter()
+            self.lexical_index = LexicalIndex.build(ids, texts, metadatas)
+            self.logger.info(f"Lexikális index felépítve: {time.perf_counter() - lexical_start:.2f} mp")
+            
+            duplicates = len(chunks) - len(ids)
+            self.last_ingest_stats = {
+                "files": load_stats["files"],
+                "streamed_files": load_stats["streamed_files"],
+                "skipped_files": load_stats["skipped_files"],
+                "load_seconds": round(load_seconds, 3),
+                "chunks": len(chunks),
+                "unique_chunks": len(ids),
+                "duplicate_chunks": duplicates,
+                "embed_seconds": round(embed_seconds, 3),
+                "estimated_embed_seconds_saved": round(embed_seconds / len(ids) * duplicates, 3) if ids else 0.0,
+                "estimated_index_bytes_saved": duplicate_chars + duplicates * len(embeddings[0]) * 4 if embeddings else 0
+            }
+            self.logger.info(
+                f"Deduplikáció: {len(chunks)} chunk, {len(ids)} egyedi, {duplicates} ismétlődő"
+            )
+            
+            # A jegyzék az adatbázis törlése után kerül ki, így az index mellett marad
+            self._save_unreadable_files()
             
+            self.index_version = next(_INDEX_VERSIONS)
             self.logger.info(f"Vektoros adatbázis sikeresen létrehozva és elmentve: {self.db_dir}")
             return True
         
@@ -385,15 +721,65 @@ class DocumentDatabase:
             self.logger.error(self._get_traceback())
             return False
 
+    @staticmethod
+    def _chunk_hash(text):
+        """
+        Chunk tartalmának hash-e a szóközök normalizálása után
+        
+        :param text: Chunk szöveg
+        :return: Hexadecimális sha1 hash
+        """
+        return hashlib.sha1(" ".join(text.split()).encode('utf8')).hexdigest()
+
+    @staticmethod
+    def chunk_references(metadata):
+        """
+        Egy tárolt chunk összes forrás hivatkozása
+        
+        :param metadata: A chunk metaadatai
+        :return: Hivatkozások (filepath, chunk_index, modified_time, file_hash) listája
+        """
+        if not metadata:
+            return []
+        if metadata.get('references'):
+            try:
+                return json.loads(metadata['references'])
+            except ValueError:
+                pass
+        return [{key: metadata[key] for key in ('filepath', 'chunk_index', 'modified_time', 'file_hash')
+                 if key in metadata}]
+
+    def _embed_chunks(self, texts):
+        """
+        Chunkok beágyazása a beállított módon
+        
+        Ha EMBEDDING_PROCESSES > 1 és elég sok a chunk, több worker processzt
+        használ, különben egy processzben, csomagokban ágyaz be.
+        
+        :param texts: Chunk szövegek listája
+        :return: Beágyazott vektorok listája, a bemenettel azonos sorrendben
+        """
+        start_time = time.perf_counter()
+        if EMBEDDING_PROCESSES > 1 and len(texts) >= EMBEDDING_MULTIPROCESS_MIN_CHUNKS:
+            self.logger.info(f"{len(texts)} chunk beágyazása {EMBEDDING_PROCESSES} worker processzel")
+            embeddings = self.embeddings.embed_documents_multiprocess(texts, EMBEDDING_PROCESSES)
+        else:
+            self.logger.info(f"{len(texts)} chunk beágyazása egy processzben")
+            embeddings = self.embeddings.embed_documents(texts)
+        self.logger.info(f"Beágyazás kész: {time.perf_counter() - start_time:.2f} mp")
+        return embeddings
+
     def delete_database(self):
         """
         Meglévő adatbázis törlése
         """
+        self.index_version = next(_INDEX_VERSIONS)
+        self.lexical_index = None
         try:
-            # Ha létezik a 'documents' collection, töröljük
+            # Ha létezik a collection, töröljük
             try:
-                self.chroma_client.delete_collection(name="documents")
-                self.logger.info("Meglévő 'documents' collection törölve")
+                self.chroma_client.delete_collection(name=self.collection_name)
+                self.logger.info(f"Meglévő '{self.collection_name}' collection törölve")
             except Exception as e:
                 self.logger.warning(f"Collection törlési hiba: {e}")
             
@@ -429,6 +815,167 @@ class DocumentDatabase:
             self.logger.error(self._get_traceback())
             raise
 
+    def index_fingerprint(self):
+        """
+        Az indexet meghatározó modell és chunkoló beállítások
+        
+        :return: Ujjlenyomat szótár
+        """
+        return {
+            "embedding_model": self.embeddings.model_name,
+            "embedding_dimension": self.embeddings.model.get_sentence_embedding_dimension(),
+            "chunker": RecursiveCharacterTextSplitter.__name__,
+            "chunk_size": CHUNK_SIZE,
+            "chunk_overlap": CHUNK_OVERLAP,
+            "schema_version": INDEX_SCHEMA_VERSION
+        }
+
+    def export_snapshot(self, path):
+        """
+        Az index kiírása hordozható pillanatkép fájlba
+        
+        :param path: Cél fájl útvonala
+        :return: Kiírt chunkok száma, hiba esetén None
+        """
+        try:
+            collection = self.chroma_client.get_collection(name=self.collection_name)
+            count = collection.count()
+            
+            def records():
+                for offset in range(0, count, COLLECTION_ADD_BATCH_SIZE):
+                    page = collection.get(
+                        offset=offset,
+                        limit=COLLECTION_ADD_BATCH_SIZE,
+                        include=["documents", "metadatas", "embeddings"]
+                    )
+                    yield from zip(page['ids'], page['documents'], page['metadatas'], page['embeddings'])
+            
+            written = write_snapshot(path, self.index_fingerprint(), records(), count,
+                                     unreadable_files=self.unreadable_files)
+            self.logger.info(f"Pillanatkép kiírva ({written} chunk): {path}")
+            return written
+        except Exception as e:
+            self.logger.error(f"Pillanatkép exportálási hiba: {e}")
+            self.logger.error(self._get_traceback())
+            return None
+
+    def import_snapshot(self, path):
+        """
+        Az index betöltése pillanatképből, embedding modell futtatása nélkül
+        
+        Eltérő modell vagy chunkoló ujjlenyomat esetén a betöltést megtagadja.
+        
+        :param path: Pillanatkép fájl útvonala
+        :return: Művelet sikeressége
+        """
+        try:
+            start_time = time.perf_counter()
+            header, records = read_snapshot(path, self.index_fingerprint())
+            
+            self.delete_database()
+            collection = self.chroma_client.get_or_create_collection(name=self.collection_name)
+            
+            batch = ([], [], [], [])
+            imported = 0
+            for record in records:
+                for column, value in zip(batch, record):
+                    column.append(value)
+                if len(batch[0]) >= COLLECTION_ADD_BATCH_SIZE:
+                    imported += self._add_snapshot_batch(collection, batch)
+                    batch = ([], [], [], [])
+            if batch[0]:
+                imported += self._add_snapshot_batch(collection, batch)
+            
+            # A kihagyott fájlok jegyzéke is a pillanatképpel érkezik, így a
+            # frissesség-ellenőrzés ugyanazt a fájlkészletet látja
+            self.unreadable_files = header.get("unreadable_files") or {}
+            self._save_unreadable_files()
+            
+            self.index_version = next(_INDEX_VERSIONS)
+            self.logger.info(
+                f"Pillanatkép betöltve ({imported}/{header.get('count')} chunk, "
+                f"{time.perf_counter() - start_time:.2f} mp): {path}"
+            )
+            return True
+        except SnapshotError as e:
+            self.logger.error(f"Pillanatkép elutasítva: {e}")
+            return False
+        except Exception as e:
+            self.logger.error(f"Pillanatkép importálási hiba: {e}")
+            self.logger.error(self._get_traceback())
+            return False
+
+    def _add_snapshot_batch(self, collection, batch):
+        ids, documents, metadatas, embeddings = batch
+        collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+        return len(ids)
+
+    def detach(self):
+        """
+        A ChromaDB rendszer eltávolítása a folyamatszintű gyorsítótárból
+        
+        A PersistentClient a rendszerét útvonal szerint gyorsítótárazza; eltávolítás
+        után az ugyanerre a könyvtárra nyitott új példány saját rendszert kap,
+        így ennek a későbbi leállítása nem érinti.
+        """
+        if self.chroma_client is None or self._detached_system is not None:
+            return
+        identifier = getattr(self.chroma_client, '_identifier', None)
+        try:
+            # A kliens _system tulajdonsága magából a gyorsítótárból olvas,
+            # ezért a rendszert az eltávolítás előtt eltesszük
+            system = self.chroma_client._system
+        except Exception as e:
+            self.logger.warning(f"ChromaDB rendszer nem található: {e}")
+            return
+        self._detached_system = system
+        cache = _shared_system_cache(identifier, system)
+        if cache is not None:
+            del cache[identifier]
+
+    def close(self):
+        """
+        A ChromaDB rendszer leállítása és a memóriában tartott indexek elengedése
+        
+        Gyorsítótárból való eltávolítás nélkül a HNSW szegmensek a memóriában
+        maradnának. A lemezen lévő index megmarad.
+        """
+        self.lexical_index = None
+        if self.chroma_client is None:
+            return
+        self.detach()
+        system, self._detached_system = self._detached_system, None
+        if system is not None:
+            try:
+                system.stop()
+                self.logger.info(f"ChromaDB rendszer leállítva: {self.db_dir}")
+            except Exception as e:
+                self.logger.warning(f"ChromaDB rendszer leállítási hiba: {e}")
+        self.chroma_client = None
+
+    def chunk_count(self):
+        """
+        :return: A tárolt chunkok száma (0, ha még nincs collection)
+        """
+        try:
+            return self.chroma_client.get_collection(name=self.collection_name).count()
+        except Exception:
+            return 0
+
+    def estimate_memory_bytes(self):
+        """
+        Az index becsült memóriaigénye (vektoros index és lexikális index)
+        
+        :return: Becsült méret bájtban
+        """
+        count = self.chunk_count()
+        dimension = self.embeddings.model.get_sentence_embedding_dimension()
+        # float32 vektorok, a HNSW gráf kb. ugyanennyi többletet jelent
+        vector_bytes = count * dimension * 4 * 2
+        lexical_index = self.lexical_index
+        lexical_bytes = lexical_index.size_bytes if lexical_index is not None else 0
+        return vector_bytes + lexical_bytes
+
     def update_database(self, new_source_dir=None):
         """
         Adatbázis frissítése
@@ -439,6 +986,7 @@ class DocumentDatabase:
         try:
             if new_source_dir:
                 self.source_dir = new_source_dir
+                self.scanner = self._create_scanner(new_source_dir)
             
             self.delete_database()
             return self.setup_database()
@@ -455,88 +1003,405 @@ class DocumentDatabase:
         :return: Dokumentumok relatív elérési útjainak listája
         """
         try:
-            text_extensions = ["py", "java", "md", "txt", "json"]
-            
-            documents = []
-            for ext in text_extensions:
-                documents.extend(list(Path(self.source_dir).glob(f"**/*.{ext}")))
+            relative_docs = [f.relpath for f in self.scanner.scan()]
             
-            relative_docs = [str(doc.relative_to(self.source_dir)) for doc in documents]
-            
-            self.logger.info(f"Talált dokumentumok: {len(relative_docs)}")
+            self.logger.debug(f"Talált dokumentumok: {len(relative_docs)}")
             return relative_docs
         except Exception as e:
             self.logger.error(f"Dokumentumok listázási hiba: {e}")
             self.logger.error(self._get_traceback())
             return []
 
-    def similarity_search(self, query, k=5):
+    def documents_version(self) -> str:
         """
-        Hasonlósági keresés a vektoros adatbázisban
+        A forrás fájllista aktuális azonosítója
         
-        :param query: Keresési lekérdezés
-        :param k: Visszaadott találatok száma
-        :return: Hasonló dokumentumok listája
+        :return: A bejárt fájllistából képzett hash (ETag-hez)
+        """
+        return self.scanner.version()
+
+    def _get_search_collection(self):
+        """
+        A keresési collection lekérése, hiánya esetén az adatbázis felépítése
+        
+        :return: Collection, vagy None ha nem érhető el
         """
         try:
-            self.logger.info(f"Hasonlósági keresés indítása: '{query}'")
+            collection = self.chroma_client.get_collection(name=self.collection_name)
+            self.logger.debug("Collection sikeresen lekérve a kereséshez")
+            return collection
+        except Exception as e:
+            self.logger.error(f"Collection lekérési hiba: {e}")
+            self.logger.info("Próbálom létrehozni az adatbázist...")
+            
+            setup_result = self.setup_database()
+            if not setup_result:
+                self.logger.error("Nem sikerült létrehozni az adatbázist a kereséshez")
+                return None
             
-            # Ellenőrizzük, hogy létezik-e a collection
             try:
-                collection = self.chroma_client.get_collection(name="documents")
-                self.logger.info("Collection sikeresen lekérve a kereséshez")
-            except Exception as e:
-                self.logger.error(f"Collection lekérési hiba: {e}")
-                self.logger.info("Próbálom létrehozni az adatbázist...")
+                return self.chroma_client.get_collection(name=self.collection_name)
+            except Exception as e2:
+                self.logger.error(f"Collection még mindig nem elérhető létrehozás után: {e2}")
+                return None
+
+    @staticmethod
+    def _normalize_path_prefix(path_prefix):
+        if not path_prefix:
+            return None
+        if path_prefix.startswith('./'):
+            path_prefix = path_prefix[2:]
+        return path_prefix.lstrip('/')
+
+    def _build_where(self, filters):
+        """
+        Metaadat szűrők átalakítása ChromaDB where feltétellé
+        
+        A path_prefix szűrőt a fájllista alapján a megfelelő filepath értékek
+        halmazára fordítjuk, így az is a vektoros keresésben érvényesül.
+        
+        :param filters: Szótár: path_prefix, extensions, modified_since (mind opcionális)
+        :return: (where feltétel vagy None, van-e egyáltalán lehetséges találat)
+        """
+        conditions = []
+        
+        path_prefix = self._normalize_path_prefix(filters.get('path_prefix'))
+        if path_prefix:
+            matching = [f.relpath for f in self.scanner.scan() if f.relpath.startswith(path_prefix)]
+            if not matching:
+                return None, False
+            conditions.append({"filepath": {"$in": matching}})
+        
+        extensions = filters.get('extensions')
+        if extensions:
+            conditions.append({"extension": {"$in": [ext.lower().lstrip('.') for ext in extensions]}})
+        
+        modified_since = filters.get('modified_since')
+        if modified_since is not None:
+            conditions.append({"modified_time": {"$gte": float(modified_since)}})
+        
+        if not conditions:
+            return None, True
+        if len(conditions) == 1:
+            return conditions[0], True
+        return {"$and": conditions}, True
+
+    def search(self, queries, k=5, filters=None, mode=None, duplicates='collapse'):
+        """
+        Kötegelt keresés metaadat szűrőkkel, LLM hívás nélkül
+        
+        Hibrid módban a főként pontos kódszimbólumokból álló lekérdezések csak
+        a lexikális indexet használják (gyors út), a többinél a vektoros és a
+        BM25 rangsor Reciprocal Rank Fusion szerint egyesül.
+        
+        Az azonos tartalmú chunkok egyszer tárolódnak; 'collapse' módban egy
+        találat az összes forrás hivatkozását tartalmazza, 'expand' módban
+        minden hivatkozás külön találatként jelenik meg.
+        
+        A szűrőknek a chunk bármely forrás hivatkozása megfelelhet; kibontáskor
+        csak a szűrőknek megfelelő hivatkozások jelennek meg.
+        
+        :param queries: Keresési lekérdezések listája
+        :param k: Lekérdezésenként visszaadott találatok száma
+        :param filters: Opcionális szűrők (path_prefix, extensions, modified_since)
+        :param mode: 'hybrid' vagy 'vector' (alapértelmezés: RETRIEVAL_MODE)
+        :param duplicates: 'collapse' vagy 'expand'
+        :return: Lekérdezésenként a találatok listája (id, content, metadata, distance, retrieval, references)
+        """
+        results = self._ranked_search(queries, k, filters, mode)
+        reference_predicate = self._reference_predicate(filters or {})
+        return [self._resolve_duplicates(hits, duplicates, reference_predicate) for hits in results]
+
+    def _resolve_duplicates(self, hits, duplicates, reference_predicate=None):
+        """
+        Deduplikált találatok összevonása vagy kibontása forrásonként
+        
+        :param hits: Egy lekérdezés találatai
+        :param duplicates: 'collapse' vagy 'expand'
+        :param reference_predicate: A szűrőknek megfelelő hivatkozásokat kiválasztó függvény (None: mind)
+        :return: Találatok references mezővel
+        """
+        resolved = []
+        for hit in hits:
+            references = self.chunk_references(hit['metadata'])
+            matching = references
+            if reference_predicate is not None:
+                matching = [reference for reference in references if reference_predicate(reference)] or references
+            if duplicates != 'expand' or len(references) <= 1:
+                # A megjelenített forrás a szűrőnek megfelelő első hivatkozás
+                metadata = hit['metadata']
+                if matching[0] is not references[0]:
+                    metadata = dict(metadata, **matching[0])
+                resolved.append(dict(hit, metadata=metadata, references=references))
+                continue
+            for reference in matching:
+                resolved.append(dict(hit, metadata=dict(hit['metadata'], **reference), references=[reference]))
+        return resolved
+
+    def _ranked_search(self, queries, k, filters, mode):
+        """
+        Rangsorolt keresés a beállított mód szerint (lásd search)
+        """
+        mode = mode or RETRIEVAL_MODE
+        if mode != 'hybrid':
+            return self._vector_search(queries, k, filters)
+        
+        try:
+            lexical_index = self._get_lexical_index()
+        except Exception as e:
+            self.logger.error(f"Lexikális index nem érhető el, csak vektoros keresés: {e}")
+            self.logger.error(self._get_traceback())
+            lexical_index = None
+        if lexical_index is None:
+            return self._vector_search(queries, k, filters)
+        
+        predicate = self._filter_predicate(filters or {})
+        results = [None] * len(queries)
+        vector_indexes = []
+        for i, query in enumerate(queries):
+            ratio, matched = lexical_index.symbol_ratio(query)
+            if matched and ratio >= LEXICAL_FAST_PATH_RATIO:
+                lexical_hits = lexical_index.search(query, k, predicate)
+                if lexical_hits:
+                    results[i] = [self._lexical_hit(hit, 'lexical') for hit in lexical_hits]
+                    continue
+            vector_indexes.append(i)
+        
+        if vector_indexes:
+            candidates = k * HYBRID_CANDIDATE_FACTOR
+            vector_results = self._vector_search([queries[i] for i in vector_indexes], candidates, filters)
+            for i, vector_hits in zip(vector_indexes, vector_results):
+                lexical_hits = lexical_index.search(queries[i], candidates, predicate)
+                results[i] = self._fuse_rankings(vector_hits, lexical_hits, k)
+        
+        self.logger.debug(
+            f"Hibrid keresés: {len(queries) - len(vector_indexes)} lexikális gyors út, "
+            f"{len(vector_indexes)} egyesített rangsor"
+        )
+        return results
+
+    def _get_lexical_index(self):
+        """
+        A lexikális index lekérése, szükség esetén felépítése a collection tartalmából
+        
+        :return: LexicalIndex, vagy None ha nincs collection
+        """
+        with self._lexical_lock:
+            if self.lexical_index is not None:
+                return self.lexical_index
+            try:
+                collection = self.chroma_client.get_collection(name=self.collection_name)
+            except Exception:
+                return None
+            
+            start_time = time.perf_counter()
+            ids, texts, metadatas = [], [], []
+            count = collection.count()
+            for offset in range(0, count, COLLECTION_ADD_BATCH_SIZE):
+                page = collection.get(offset=offset, limit=COLLECTION_ADD_BATCH_SIZE,
+                                      include=["documents", "metadatas"])
+                ids.extend(page['ids'])
+                texts.extend(page['documents'])
+                metadatas.extend(page['metadatas'])
+            self.lexical_index = LexicalIndex.build(ids, texts, metadatas)
+            self.logger.info(
+                f"Lexikális index felépítve a collectionből ({len(ids)} chunk, "
+                f"{time.perf_counter() - start_time:.2f} mp)"
+            )
+            return self.lexical_index
+
+    def _reference_predicate(self, filters):
+        """
+        A metaadat szűrők Python megfelelője egy forrás hivatkozásra
+        
+        :param filters: Szótár: path_prefix, extensions, modified_since
+        :return: Hivatkozást (filepath, modified_time) vizsgáló függvény, vagy None ha nincs szűrő
+        """
+        path_prefix = self._normalize_path_prefix(filters.get('path_prefix'))
+        extensions = {ext.lower().lstrip('.') for ext in filters.get('extensions') or []}
+        modified_since = filters.get('modified_since')
+        if not path_prefix and not extensions and modified_since is None:
+            return None
+        
+        def predicate(reference):
+            filepath = str(reference.get('filepath', ''))
+            if path_prefix and not filepath.startswith(path_prefix):
+                return False
+            if extensions and (filepath.rsplit('.', 1)[-1].lower() if '.' in filepath else '') not in extensions:
+                return False
+            if modified_since is not None and (reference.get('modified_time') or 0) < float(modified_since):
+                return False
+            return True
+        return predicate
+
+    def _filter_predicate(self, filters):
+        """
+        A metaadat szűrők Python megfelelője egy tárolt chunkra
+        
+        Egy deduplikált chunk akkor felel meg, ha bármelyik forrás hivatkozása megfelel.
+        
+        :param filters: Szótár: path_prefix, extensions, modified_since
+        :return: Metaadatot vizsgáló függvény, vagy None ha nincs szűrő
+        """
+        reference_predicate = self._reference_predicate(filters)
+        if reference_predicate is None:
+            return None
+        
+        def predicate(metadata):
+            return any(reference_predicate(reference) for reference in self.chunk_references(metadata))
+        return predicate
+
+    @staticmethod
+    def _lexical_hit(hit, retrieval):
+        doc_id, content, metadata, score = hit
+        return {
+            "id": doc_id,
+            "content": content,
+            "metadata": metadata,
+            "distance": None,
+            "lexical_score": score,
+            "retrieval": retrieval
+        }
+
+    def _fuse_rankings(self, vector_hits, lexical_hits, k):
+        """
+        Vektoros és lexikális rangsor egyesítése Reciprocal Rank Fusion szerint
+        
+        :param vector_hits: Vektoros találatok (távolság szerint rendezve)
+        :param lexical_hits: Lexikális találatok (BM25 pontszám szerint rendezve)
+        :param k: Visszaadott találatok száma
+        :return: Egyesített találatok listája
+        """
+        fused = {}
+        scores = {}
+        for rank, hit in enumerate(vector_hits):
+            fused[hit['id']] = dict(hit, retrieval='vector')
+            scores[hit['id']] = 1.0 / (RRF_K + rank + 1)
+        for rank, lexical in enumerate(lexical_hits):
+            doc_id = lexical[0]
+            if doc_id in fused:
+                fused[doc_id]['retrieval'] = 'hybrid'
+                fused[doc_id]['lexical_score'] = lexical[3]
+            else:
+                fused[doc_id] = self._lexical_hit(lexical, 'lexical')
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        
+        ranked = sorted(fused, key=lambda doc_id: scores[doc_id], reverse=True)
+        return [fused[doc_id] for doc_id in ranked[:k]]
+
+    def _vector_search(self, queries, k=5, filters=None):
+        """
+        Kötegelt vektoros hasonlósági keresés metaadat szűrőkkel
+        
+        :param queries: Keresési lekérdezések listája
+        :param k: Lekérdezésenként visszaadott találatok száma
+        :param filters: Opcionális szűrők (path_prefix, extensions, modified_since)
+        :return: Lekérdezésenként a találatok listája (id, content, metadata, distance)
+        """
+        try:
+            self.logger.debug(f"Vektoros keresés indítása {len(queries)} lekérdezéssel (k={k}, szűrők: {filters})")
+            
+            where, satisfiable = self._build_where(filters or {})
+            if not satisfiable:
+                self.logger.info("A szűrőknek egyetlen dokumentum sem felel meg")
+                return [[] for _ in queries]
+            
+            collection = self._get_search_collection()
+            if collection is None:
+                return [[] for _ in queries]
+            
+            # Lekérdezések beágyazása egy kötegben
+            query_embeddings = self.embeddings.embed_queries(list(queries))
+            
+            # A deduplikált chunkok metaadata csak az első hivatkozást tartalmazza, ezért
+            # szűréskor az ismétlődő chunkok is jelöltek, és a hivatkozásaik döntenek
+            predicate = None
+            if where is not None:
+                where = {"$or": [where, {"duplicate_count": {"$gt": 1}}]}
+                predicate = self._filter_predicate(filters)
+            
+            # Keresés végrehajtása; ha az utószűrés után kevesebb mint k találat maradt,
+            # de lehet még több jelölt, az érintett lekérdezések bővebb kerettel ismétlődnek
+            all_hits = [[] for _ in queries]
+            pending = list(range(len(queries)))
+            n_results = k
+            while pending:
+                results = collection.query(
+                    query_embeddings=[query_embeddings[q] for q in pending],
+                    n_results=n_results,
+                    where=where,
+                    include=["documents", "metadatas", "distances"]
+                )
                 
-                setup_result = self.setup_database()
-                if not setup_result:
-                    self.logger.error("Nem sikerült létrehozni az adatbázist a kereséshez")
-                    return []
+                # Eredmények ellenőrzése
+                if not results or 'documents' not in results or not results['documents']:
+                    self.logger.warning("Nem találtunk egyező dokumentumot")
+                    break
                 
-                try:
-                    collection = self.chroma_client.get_collection(name="documents")
-                except Exception as e2:
-                    self.logger.error(f"Collection még mindig nem elérhető létrehozás után: {e2}")
-                    return []
-            
-            # Query beágyazása
-            query_embedding = self.embeddings.embed_query(query)
-            
-            # Keresés végrehajtása
-            results = collection.query(
-                query_embeddings=[query_embedding],
-                n_results=k,
-                include=["documents", "metadatas", "distances"]
-            )
+                # Eredmények feldolgozása
+                retry = []
+                for row, q in enumerate(pending):
+                    distances = results['distances'][row] if results.get('distances') else None
+                    hits = []
+                    for i, (doc_id, content, metadata) in enumerate(
+                        zip(results['ids'][row], results['documents'][row], results['metadatas'][row])
+                    ):
+                        hits.append({
+                            "id": doc_id,
+                            "content": content,
+                            "metadata": metadata,
+                            "distance": distances[i] if distances else None,
+                            "retrieval": "vector"
+                        })
+                    if predicate is not None:
+                        candidates = len(hits)
+                        hits = [hit for hit in hits if predicate(hit['metadata'])]
+                        if len(hits) < k and candidates >= n_results:
+                            retry.append(q)
+                    all_hits[q] = hits[:k]
+                pending = retry
+                n_results *= 2
+            return all_hits
+        
+        except Exception as e:
+            self.logger.error(f"Keresés sikertelen: {e}")
+            self.logger.error(self._get_traceback())
+            return [[] for _ in queries]
+
+    def similarity_search(self, query, k=5, filters=None):
+        """
+        Hasonlósági keresés a vektoros adatbázisban
+        
+        :param query: Keresési lekérdezés
+        :param k: Visszaadott találatok száma
+        :param filters: Opcionális metaadat szűrők (lásd search)
+        :return: Hasonló dokumentumok listája
+        """
+        try:
+            self.logger.debug(f"Hasonlósági keresés indítása: '{query}'")
             
-            # Eredmények ellenőrzése
-            if (not results or 
-                'documents' not in results or 
-                not results['documents'] or 
-                len(results['documents'][0]) == 0):
+            hits = self.search([query], k=k, filters=filters)[0]
+            if not hits:
                 self.logger.warning("Nem találtunk egyező dokumentumot")
                 return []
-                
-            # Eredmények feldolgozása
-            documents = results['documents'][0]
-            metadatas = results['metadatas'][0]
-            distances = results['distances'][0] if 'distances' in results else None
             
             # Document objektumok létrehozása
             result_docs = []
             
-            for i, (content, metadata) in enumerate(zip(documents, metadatas)):
-                dist_info = f" (távolság: {distances[i]:.4f})" if distances else ""
-                self.logger.info(f"Találat {i+1}{dist_info}: {metadata.get('filepath', 'ismeretlen')}")
+            log_hits = self.logger.isEnabledFor(logging.DEBUG)
+            for i, hit in enumerate(hits):
+                metadata = hit['metadata']
+                if log_hits:
+                    dist_info = f" (távolság: {hit['distance']:.4f})" if hit['distance'] is not None else f" ({hit['retrieval']})"
+                    self.logger.debug(f"Találat {i+1}{dist_info}: {metadata.get('filepath', 'ismeretlen')}")
                 
                 doc = Document(
-                    page_content=content,
+                    page_content=hit['content'],
                     metadata=metadata
                 )
                 result_docs.append(doc)
             
-            self.logger.info(f"Összesen {len(result_docs)} találat visszaadva")
+            self.logger.debug(f"Összesen {len(result_docs)} találat visszaadva")
             return result_docs
             
         except Exception as e:
@@ -544,4 +1409,4 @@ class DocumentDatabase:
             # Hibaelhárítási diagnosztika
             self.logger.error(f"Részletes hiba: {str(e)}")
             self.logger.error(self._get_traceback())
-            return []
\ No newline at end of file
+            return []
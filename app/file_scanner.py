@@ -0,0 +1,298 @@
+import os
+import re
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+# Egy beolvasható forrásfájl adatai
+SourceFile = namedtuple('SourceFile', ['relpath', 'path', 'size', 'mtime'])
+
+# Mindig kihagyott könyvtárak és fájlminták (.gitignore szintaxis)
+DEFAULT_IGNORE_PATTERNS = ['.git/', 'target/', 'node_modules/', '__pycache__/']
+
+
+def gitignore_regex(pattern):
+    """
+    .gitignore minta reguláris kifejezéssé alakítása
+
+    A '*', '?' és '[...]' egy útvonal-szegmensen belül illeszkedik (nem
+    illeszkedik '/'-re); a '**/' nulla vagy több könyvtárat, a záró '**'
+    bármilyen mélységű folytatást fed le.
+
+    :param pattern: Minta a záró '/' és a horgonyzó kezdő '/' nélkül
+    :return: A teljes útvonalra illesztendő lefordított kifejezés
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[' and pattern.find(']', i + 2) != -1:
+            end = pattern.find(']', i + 2)
+            body = pattern[i + 1:end]
+            if body[0] in '!^':
+                # A tagadott karakterosztály sem lép át szegmenshatárt
+                body = '^' + body[1:] + '/'
+            parts.append('[' + body.replace('\\', '\\\\') + ']')
+            i = end + 1
+            continue
+        elif char == '\\' and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+            continue
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return re.compile(''.join(parts) + r'\Z')
+
+
+class IgnoreRules:
+    """
+    Egy könyvtárra vonatkozó .gitignore minták egyszerűsített kiértékelése
+
+    Támogatott: megjegyzések, záró '/' (csak könyvtár), '/'-t tartalmazó
+    (a szabályfájl könyvtárához horgonyzott) minták, '**' és '!' kivételek.
+    """
+    def __init__(self, base_relpath, patterns):
+        """
+        :param base_relpath: A szabályokat tartalmazó könyvtár relatív útja ('' a gyökér)
+        :param patterns: .gitignore sorok listája
+        """
+        self.base_relpath = base_relpath
+        self.rules = []
+        for line in patterns:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            # Kezdő vagy belső '/' a szabályfájl könyvtárához horgonyoz (pl. /*.md)
+            anchored = '/' in line
+            line = line.lstrip('/')
+            if not line:
+                continue
+            self.rules.append((gitignore_regex(line), negated, dir_only, anchored))
+
+    @classmethod
+    def from_file(cls, base_relpath, gitignore_path):
+        """
+        Szabályok beolvasása egy .gitignore fájlból
+
+        :return: IgnoreRules példány, vagy None ha a fájl nem olvasható
+        """
+        try:
+            with open(gitignore_path, encoding='utf8', errors='replace') as f:
+                return cls(base_relpath, f.read().splitlines())
+        except OSError:
+            return None
+
+    def match(self, relpath, is_dir):
+        """
+        :param relpath: A vizsgált bejegyzés forrás gyökérhez viszonyított útja
+        :param is_dir: Könyvtár-e a bejegyzés
+        :return: True ha kihagyandó, False ha kifejezetten megtartandó, None ha nincs találat
+        """
+        if self.base_relpath:
+            if not relpath.startswith(self.base_relpath + '/'):
+                return None
+            relpath = relpath[len(self.base_relpath) + 1:]
+        name = relpath.rsplit('/', 1)[-1]
+        result = None
+        for pattern, negated, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            target = relpath if anchored else name
+            if pattern.match(target):
+                result = not negated
+        return result
+
+
+class SourceScanner:
+    """
+    Forrás könyvtár egyszeri, os.scandir alapú bejárása gyorsítótárazott fájllistával
+
+    A fájllista a könyvtárak módosítási idejével validált: ha egyik bejárt
+    könyvtár sem változott, a következő lekérdezés nem olvassa újra a fát.
+    Helyben módosított fájlok esetén a validate_files=True ismételt stat
+    hívásokkal frissíti a méretet és a módosítási időt.
+    """
+    def __init__(self, root, extensions, max_file_size=None, ignore_patterns=None, size_limits=None):
+        """
+        :param root: Forrás könyvtár
+        :param extensions: Elfogadott (kisbetűs) kiterjesztések listája
+        :param max_file_size: Legnagyobb elfogadott fájlméret bájtban (None: nincs korlát)
+        :param ignore_patterns: Kiegészítő kihagyási minták (.gitignore szintaxis)
+        :param size_limits: Kiterjesztésenkénti méretkorlátok bájtban (a max_file_size helyett)
+        """
+        self.root = root
+        self.extensions = {ext.lower() for ext in extensions}
+        self.max_file_size = max_file_size
+        self.size_limits = {ext.lower(): limit for ext, limit in (size_limits or {}).items()}
+        self.base_rules = IgnoreRules('', DEFAULT_IGNORE_PATTERNS + list(ignore_patterns or []))
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._dir_mtimes: Dict[str, int] = {}
+        self._files: Optional[List[SourceFile]] = None
+        self._version: Optional[str] = None
+        self.skipped: List[tuple] = []
+
+    def invalidate(self):
+        """
+        Gyorsítótár ürítése, a következő lekérdezés újra bejárja a fát
+        """
+        with self._lock:
+            self._files = None
+            self._version = None
+            self._dir_mtimes = {}
+
+    def scan(self, validate_files=False) -> List[SourceFile]:
+        """
+        Fájllista lekérése, szükség esetén újrabejárással
+
+        :param validate_files: Gyorsítótár találat esetén a fájlok újra stat-olása
+        :return: SourceFile elemek relatív út szerint rendezve
+        """
+        with self._lock:
+            if self._files is not None and self._dirs_unchanged():
+                if validate_files:
+                    self._refresh_file_stats()
+                return self._files
+
+            self._walk()
+            return self._files
+
+    def version(self) -> str:
+        """
+        A fájllista tartalmi azonosítója (pl. ETag-hez)
+
+        :return: Az útvonalakból, méretekből és módosítási időkből képzett hash
+        """
+        self.scan()
+        with self._lock:
+            if self._version is None:
+                digest = hashlib.sha1()
+                for f in self._files:
+                    digest.update(f"{f.relpath}\0{f.size}\0{f.mtime}\n".encode('utf8'))
+                self._version = digest.hexdigest()
+            return self._version
+
+    def size_limit(self, relpath):
+        """
+        :param relpath: Fájl relatív útja
+        :return: A fájlra vonatkozó méretkorlát bájtban (None: nincs korlát)
+        """
+        ext = relpath.rsplit('.', 1)[-1].lower() if '.' in relpath else ''
+        return self.size_limits.get(ext, self.max_file_size)
+
+    def _dirs_unchanged(self):
+        for path, mtime in self._dir_mtimes.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _refresh_file_stats(self):
+        refreshed = []
+        changed = False
+        for f in self._files:
+            try:
+                st = os.stat(f.path)
+            except OSError:
+                changed = True
+                continue
+            if st.st_size != f.size or st.st_mtime != f.mtime:
+                changed = True
+                limit = self.size_limit(f.relpath)
+                if limit is not None and st.st_size > limit:
+                    self.skipped.append((f.relpath, 'méretkorlát'))
+                    continue
+                f = f._replace(size=st.st_size, mtime=st.st_mtime)
+            refreshed.append(f)
+        if changed:
+            self._files = refreshed
+            self._version = None
+
+    def _walk(self):
+        files = []
+        dir_mtimes = {}
+        skipped = []
+        # Verem elemei: (abszolút út, relatív út, érvényes szabálylisták)
+        stack = [(self.root, '', [self.base_rules])]
+
+        while stack:
+            dir_path, dir_rel, rules = stack.pop()
+            try:
+                dir_mtimes[dir_path] = os.stat(dir_path).st_mtime_ns
+                with os.scandir(dir_path) as it:
+                    entries = list(it)
+            except OSError as e:
+                self.logger.warning(f"Könyvtár nem olvasható: {dir_path}: {e}")
+                continue
+
+            # A könyvtár saját .gitignore fájlja az alatta lévőkre vonatkozik
+            for entry in entries:
+                if entry.name == '.gitignore' and entry.is_file():
+                    local_rules = IgnoreRules.from_file(dir_rel, entry.path)
+                    if local_rules is not None:
+                        rules = rules + [local_rules]
+                    break
+
+            for entry in entries:
+                relpath = f"{dir_rel}/{entry.name}" if dir_rel else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if self._ignored(rules, relpath, is_dir):
+                    continue
+                if is_dir:
+                    stack.append((entry.path, relpath, rules))
+                    continue
+
+                ext = entry.name.rsplit('.', 1)[-1].lower() if '.' in entry.name else ''
+                if ext not in self.extensions:
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                limit = self.size_limits.get(ext, self.max_file_size)
+                if limit is not None and st.st_size > limit:
+                    skipped.append((relpath, 'méretkorlát'))
+                    continue
+                files.append(SourceFile(relpath, entry.path, st.st_size, st.st_mtime))
+
+        files.sort(key=lambda f: f.relpath)
+        self._files = files
+        self._dir_mtimes = dir_mtimes
+        self._version = None
+        self.skipped = skipped
+        self.logger.debug(f"Forrás könyvtár bejárva: {len(files)} fájl, {len(dir_mtimes)} könyvtár")
+
+    @staticmethod
+    def _ignored(rules, relpath, is_dir):
+        ignored = False
+        for rule_set in rules:
+            result = rule_set.match(relpath, is_dir)
+            if result is not None:
+                ignored = result
+        return ignored
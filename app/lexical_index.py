@@ -0,0 +1,181 @@
+import re
+import math
+from collections import Counter, defaultdict
+
+# Szavak és azonosítók Unicode betűkkel (ékezetes szavak egyben): Java nevek,
+# minősített nevek (a.b.C), Maven artifact ID-k (spring-boot-starter)
+IDENTIFIER_RE = re.compile(r'[^\W\d][\w$]*(?:[.\-][^\W\d][\w$]*)*')
+# Java / Maven azonosító (ASCII); csak ilyen lehet kódszimbólum
+JAVA_IDENTIFIER_RE = re.compile(r'[A-Za-z_$][A-Za-z0-9_$]*(?:[.\-][A-Za-z_$][A-Za-z0-9_$]*)*')
+# Betű- és számsorozatok a részekre bontáshoz (az aláhúzás elválasztó)
+SUBWORD_RUN_RE = re.compile(r'[^\W\d_]+|\d+')
+# Szimbólumnak tekintett azonosító: belső nagybetű, aláhúzás, pont, kötőjel vagy szám
+SYMBOL_RE = re.compile(r'[a-z][A-Z]|[A-Z]{2,}[a-z]|[_.\-]|[0-9]')
+
+# Gyakori szavak, amelyek nem számítanak a szimbólumarányba
+STOPWORDS = frozenset("""
+a an and are as at be by do does for from how i in is it of on or the this to what where which who why with
+az és egy hogy mi mit mik hol hogyan miért mikor milyen mire melyik mely ami amely van vannak
+nem ez ezt azt is meg vagy de ha kell lehet csinál csinálja működik
+""".split())
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def split_subwords(part):
+    """
+    camelCase / PascalCase / SNAKE_CASE azonosító részekre bontása
+
+    A kis- és nagybetűhatárokat Unicode betűkre is felismeri (pl. felhasználóNév).
+
+    :param part: Pont és kötőjel nélküli azonosító
+    :return: Részek listája eredeti írásmóddal
+    """
+    subwords = []
+    for run in SUBWORD_RUN_RE.findall(part):
+        start = 0
+        for i in range(1, len(run)):
+            previous, current = run[i - 1], run[i]
+            following = run[i + 1] if i + 1 < len(run) else ''
+            # fooBar -> foo|Bar, HTTPServer -> HTTP|Server
+            if current.isupper() and (previous.islower() or (previous.isupper() and following.islower())):
+                subwords.append(run[start:i])
+                start = i
+        subwords.append(run[start:])
+    return subwords
+
+
+def identifier_tokens(text):
+    """
+    Azonosító-érzékeny tokenizálás
+
+    Minden azonosító teljes (kisbetűs) alakja bekerül, a minősített nevek és
+    az összetett (camelCase, snake_case, kötőjeles) nevek részei is.
+
+    :param text: Bemeneti szöveg
+    :return: Tokenek listája
+    """
+    tokens = []
+    for match in IDENTIFIER_RE.finditer(text):
+        identifier = match.group(0)
+        tokens.append(identifier.lower())
+        parts = re.split(r'[.\-]', identifier)
+        for part in parts:
+            if len(parts) > 1:
+                tokens.append(part.lower())
+            subwords = split_subwords(part)
+            if len(subwords) > 1:
+                tokens.extend(subword.lower() for subword in subwords)
+    return tokens
+
+
+def is_symbol(identifier):
+    """
+    :param identifier: Eredeti írásmódú azonosító
+    :return: True ha kódszimbólumnak tűnik (nem közönséges szó)
+    """
+    return bool(JAVA_IDENTIFIER_RE.fullmatch(identifier) and SYMBOL_RE.search(identifier))
+
+
+class LexicalIndex:
+    """
+    Memóriabeli BM25 invertált index azonosító-érzékeny tokenekkel
+    """
+    def __init__(self):
+        self.documents = []
+        self.postings = defaultdict(dict)
+        self.doc_lengths = []
+        self.symbols = set()
+        self.avg_doc_length = 0.0
+        self.size_bytes = 0
+        self._idf = {}
+
+    @classmethod
+    def build(cls, ids, texts, metadatas):
+        """
+        Index felépítése a chunkokból
+
+        :param ids: Chunk azonosítók
+        :param texts: Chunk szövegek
+        :param metadatas: Chunk metaadatok
+        :return: LexicalIndex példány
+        """
+        index = cls()
+        for doc_id, text, metadata in zip(ids, texts, metadatas):
+            index._add(doc_id, text, metadata)
+        index._finalize()
+        return index
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _add(self, doc_id, text, metadata):
+        doc_index = len(self.documents)
+        self.documents.append((doc_id, text, metadata))
+        counts = Counter(identifier_tokens(text))
+        for token, tf in counts.items():
+            self.postings[token][doc_index] = tf
+        self.doc_lengths.append(sum(counts.values()))
+        for match in IDENTIFIER_RE.finditer(text):
+            if is_symbol(match.group(0)):
+                self.symbols.add(match.group(0).lower())
+
+    def _finalize(self):
+        n = len(self.documents)
+        self.avg_doc_length = (sum(self.doc_lengths) / n) if n else 0.0
+        self._idf = {
+            token: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, docs in self.postings.items()
+        }
+        self.postings = dict(self.postings)
+        # Durva becslés: chunk szövegek + posting bejegyzések + szótár
+        posting_entries = sum(len(docs) for docs in self.postings.values())
+        self.size_bytes = (sum(len(text) for _, text, _ in self.documents)
+                           + posting_entries * 100 + len(self.postings) * 150)
+
+    def symbol_ratio(self, query):
+        """
+        A lekérdezés tartalmas azonosítói közül az indexben pontosan
+        szereplő kódszimbólumok aránya
+
+        :param query: Keresési lekérdezés
+        :return: (arány, talált szimbólumok száma)
+        """
+        identifiers = [m.group(0) for m in IDENTIFIER_RE.finditer(query)
+                       if m.group(0).lower() not in STOPWORDS]
+        if not identifiers:
+            return 0.0, 0
+        matched = sum(1 for identifier in identifiers
+                      if is_symbol(identifier) and identifier.lower() in self.symbols)
+        return matched / len(identifiers), matched
+
+    def search(self, query, k=5, predicate=None):
+        """
+        BM25 keresés
+
+        :param query: Keresési lekérdezés
+        :param k: Visszaadott találatok száma
+        :param predicate: Opcionális metaadat szűrő függvény
+        :return: (id, szöveg, metaadat, pontszám) elemek csökkenő pontszám szerint
+        """
+        scores = defaultdict(float)
+        for token in set(identifier_tokens(query)):
+            docs = self.postings.get(token)
+            if not docs:
+                continue
+            idf = self._idf[token]
+            for doc_index, tf in docs.items():
+                length_norm = 1 - BM25_B + BM25_B * self.doc_lengths[doc_index] / (self.avg_doc_length or 1)
+                scores[doc_index] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for doc_index, score in ranked:
+            doc_id, text, metadata = self.documents[doc_index]
+            if predicate is not None and not predicate(metadata):
+                continue
+            results.append((doc_id, text, metadata, score))
+            if len(results) >= k:
+                break
+        return results
@@ -1,8 +1,73 @@
 import os
-import sys
+import time
 import logging
 import traceback
+from types import SimpleNamespace
+from anthropic import APITimeoutError
 from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import HumanMessage
+
+from logging_setup import configure_logging
+
+# Egy modellhívás legnagyobb időtartama másodpercben
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', '60'))
+# Modell háttér: 'anthropic' vagy 'fake' (terheléses teszthez, API hívás nélkül)
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'anthropic')
+# A fake modell válaszideje és válaszhossza
+FAKE_LLM_LATENCY_MS = float(os.getenv('FAKE_LLM_LATENCY_MS', '800'))
+FAKE_LLM_RESPONSE_CHARS = int(os.getenv('FAKE_LLM_RESPONSE_CHARS', '1500'))
+
+class GenerationTimeout(Exception):
+    """
+    A modellhívás nem fejeződött be a megadott időn belül
+    """
+
+class FakeChatModel:
+    """
+    API hívás nélküli modell terheléses tesztekhez
+    
+    Rögzített késleltetés után a prompt hosszától független, rögzített
+    hosszúságú választ ad, a ChatAnthropic.invoke-kal azonos formában.
+    """
+    def __init__(self, latency_ms=FAKE_LLM_LATENCY_MS, response_chars=FAKE_LLM_RESPONSE_CHARS):
+        self.latency_ms = latency_ms
+        self.response_chars = response_chars
+    
+    def invoke(self, prompt, timeout=None):
+        if timeout is not None and self.latency_ms / 1000 > timeout:
+            time.sleep(max(timeout, 0))
+            raise TimeoutError("A fake modell válasza túllépte az időkorlátot")
+        time.sleep(self.latency_ms / 1000)
+        text = "Ez egy terheléses teszthez generált válasz. "
+        content = (text * (self.response_chars // len(text) + 1))[:self.response_chars]
+        return SimpleNamespace(content=content)
+
+class TimeLimitedChatModel:
+    """
+    ChatAnthropic hívása hívásonkénti időkorláttal
+    
+    A langchain-anthropic 0.1.1 sem a default_request_timeout-ot, sem az invoke
+    kulcsszavas argumentumait nem adja tovább az Anthropic kliensnek, így ott az
+    SDK alapértelmezése (600 mp, újrapróbálásokkal) érvényesülne. Ezért a modell
+    paramétereivel a ChatAnthropic saját kliensét hívjuk, az időkorlátot a
+    kéréshez kötve és újrapróbálás nélkül, hogy a határidő ne sokszorozódjon.
+    """
+    def __init__(self, chat_model, timeout=LLM_TIMEOUT_SECONDS):
+        """
+        :param chat_model: A konfigurált ChatAnthropic példány
+        :param timeout: Alapértelmezett időkorlát mp-ben
+        """
+        self.chat_model = chat_model
+        self.timeout = timeout
+    
+    def invoke(self, prompt, timeout=None):
+        client = self.chat_model._client.with_options(
+            timeout=self.timeout if timeout is None else timeout,
+            max_retries=0
+        )
+        params = self.chat_model._format_params(messages=[HumanMessage(content=prompt)])
+        data = client.messages.create(**params)
+        return SimpleNamespace(content=data.content[0].text if data.content else "")
 
 class LLMService:
     def __init__(self):
@@ -10,28 +75,14 @@ class LLMService:
         Initialize the Language Model Service
         Uses environment variables for API key and configuration
         """
-        # Log könyvtár és fájl útvonalának meghatározása
-        log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs')
-        log_file = os.path.join(log_dir, 'llm_service.log')
-        
-        # Log könyvtár létrehozása, ha nem létezik
-        os.makedirs(log_dir, exist_ok=True)
-        
-        # Logger létrehozása a basicConfig előtt
+        # Naplózás beállítása (egyszeri, a további példányok a meglévőt használják)
+        configure_logging()
         self.logger = logging.getLogger(__name__)
         
-        # Naplózás konfigurálása
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            filename=log_file,
-            filemode='a'
-        )
-        
-        # Konzol kimenet hozzáadása
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.DEBUG)
-        self.logger.addHandler(console_handler)
+        if LLM_BACKEND == 'fake':
+            self.model = FakeChatModel()
+            self.logger.warning(f"Fake LLM használata ({FAKE_LLM_LATENCY_MS:.0f} ms késleltetés), API hívás nem történik")
+            return
         
         # API kulcs ellenőrzése
         try:
@@ -46,24 +97,26 @@ class LLMService:
         
         # Claude modell inicializálása
         try:
-            self.model = ChatAnthropic(
+            self.model = TimeLimitedChatModel(ChatAnthropic(
                 model_name="claude-3-haiku-20240307",
                 anthropic_api_key=api_key,
                 temperature=0.2  # Alacsony hőmérséklet a több determinisztikus válaszért
-            )
+            ))
             self.logger.info("Claude Haiku modell sikeresen inicializálva")
         except Exception as e:
             self.logger.error(f"LLM inicializálási hiba: {e}")
             self.logger.error(traceback.format_exc())
             raise
     
-    def generate_response(self, query, context_docs):
+    def generate_response(self, query, context_docs, timeout=None):
         """
         Válasz generálása RAG megközelítéssel
         
         :param query: Felhasználói kérdés
         :param context_docs: Visszakeresett kontextuális dokumentumok
+        :param timeout: A modellhívás időkorlátja mp-ben (None: LLM_TIMEOUT_SECONDS)
         :return: Generált válasz a modelltől
+        :raises GenerationTimeout: Ha a modell nem válaszolt az időkorláton belül
         """
         try:
             # Kontextus előkészítése - ellenőrizzük, hogy van-e visszakeresett dokumentum
@@ -75,7 +128,7 @@ class LLMService:
                     f"--- Dokumentum {i+1} ---\n{doc.page_content}" 
                     for i, doc in enumerate(context_docs)
                 ])
-                self.logger.info(f"{len(context_docs)} dokumentum használata kontextusként")
+                self.logger.debug(f"{len(context_docs)} dokumentum használata kontextusként")
             
             # Prompt összeállítása kontextussal
             prompt = f"""Te egy segítőkész AI asszisztens vagy, aki egy Java projekt fejlesztésén dolgozik.
@@ -92,22 +145,33 @@ A válaszod legyen jól strukturált és könnyen érthető. Ha kódot írsz, ha
             
             # Válasz generálása
             try:
-                self.logger.info(f"Válasz generálása a következő kérdésre: '{query}'")
-                response = self.model.invoke(prompt)
+                self.logger.debug(f"Válasz generálása a következő kérdésre: '{query}'")
+                if timeout is None:
+                    response = self.model.invoke(prompt)
+                elif timeout <= 0:
+                    raise GenerationTimeout("Nem maradt idő a válasz generálására")
+                else:
+                    # A hívásonkénti időkorlát magára az API kérésre vonatkozik
+                    response = self.model.invoke(prompt, timeout=min(timeout, LLM_TIMEOUT_SECONDS))
                 
                 # Ellenőrizzük, hogy van-e tartalom a válaszban
                 if not hasattr(response, 'content') or not response.content:
                     self.logger.error("Üres válasz érkezett a modelltől")
                     return "Sajnos nem sikerült választ generálni a kérdésedre. Kérlek, próbáld meg később vagy fogalmazd át a kérdést."
                 
-                self.logger.info("Válasz sikeresen generálva")
+                self.logger.debug("Válasz sikeresen generálva")
                 return response.content
             
+            except (GenerationTimeout, APITimeoutError, TimeoutError) as e:
+                self.logger.warning(f"Válasz generálása időtúllépés miatt megszakítva: {e}")
+                raise GenerationTimeout(str(e))
             except Exception as e:
                 self.logger.error(f"Válasz generálási hiba a modell meghívásakor: {e}")
                 self.logger.error(traceback.format_exc())
                 return f"Hiba történt a válasz generálása közben: {str(e)}"
         
+        except GenerationTimeout:
+            raise
         except Exception as e:
             self.logger.error(f"Válasz generálási folyamat hibája: {e}")
             self.logger.error(traceback.format_exc())
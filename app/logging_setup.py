@@ -0,0 +1,92 @@
+import os
+import sys
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Alapértelmezett naplózási szint
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+# Modulonkénti szintek, pl. "database=DEBUG,llm_service=WARNING,main=INFO"
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+
+_lock = threading.Lock()
+_listener = None
+
+
+def parse_levels(spec):
+    """
+    Modulonkénti naplózási szintek feldolgozása
+
+    :param spec: "modul=SZINT,modul2=SZINT" formájú szöveg
+    :return: Szótár: logger név -> szint
+    """
+    levels = {}
+    for item in spec.split(','):
+        if '=' not in item:
+            continue
+        name, level = (part.strip() for part in item.split('=', 1))
+        if name and level:
+            levels[name] = level.upper()
+            # A közvetlenül indított main.py loggere __main__ néven fut
+            if name == 'main':
+                levels['__main__'] = level.upper()
+    return levels
+
+
+def configure_logging(log_dir=None, stream=None):
+    """
+    Egyszeri, sorban (queue) pufferelt naplózás beállítása
+
+    A kérést kiszolgáló szál csak a sorba tesz, a fájl- és konzolírást egy
+    háttérszál (QueueListener) végzi. Ismételt hívás nem csinál semmit.
+
+    :param log_dir: Napló könyvtár (alapértelmezés: <projekt>/logs)
+    :param stream: Konzol kimenet (alapértelmezés: sys.stdout)
+    :return: True ha most történt a beállítás, False ha már korábban megtörtént
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return False
+
+        if log_dir is None:
+            log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'logs')
+        os.makedirs(log_dir, exist_ok=True)
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        file_handler = logging.FileHandler(os.path.join(log_dir, 'app.log'), mode='a', encoding='utf8')
+        file_handler.setFormatter(formatter)
+        console_handler = logging.StreamHandler(stream or sys.stdout)
+        console_handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(QueueHandler(log_queue))
+        root.setLevel(LOG_LEVEL.upper())
+
+        for name, level in parse_levels(LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+        return True
+
+
+def shutdown_logging():
+    """
+    A háttérszál leállítása a sorban maradt bejegyzések kiírása után
+    """
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
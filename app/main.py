@@ -1,5 +1,6 @@
 import os
 import sys
+import hmac
 import time
 import logging
 import traceback
@@ -16,32 +17,56 @@ sys.path.append(current_dir)
 # Környezeti változók betöltése
 load_dotenv()
 
-# Log könyvtár és fájl útvonalának meghatározása
-log_dir = os.path.join(project_root, 'logs')
-log_file = os.path.join(log_dir, 'app.log')
-
-# Log könyvtár létrehozása, ha nem létezik
-os.makedirs(log_dir, exist_ok=True)
-
-# Naplózás konfigurálása
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    filename=log_file,
-    filemode='a'
-)
+# Naplózás beállítása: egyszeri, sorban pufferelt, modulonként állítható szintekkel
+from logging_setup import configure_logging
+configure_logging(os.path.join(project_root, 'logs'))
 logger = logging.getLogger(__name__)
 
-# Konzol kimenet hozzáadása
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
-logger.addHandler(console_handler)
-
 # Saját modulok importálása
-from database import DocumentDatabase
-from llm_service import LLMService
+from cache import LRUCache
+from projects import ProjectRegistry, UnknownProjectError, parse_projects
+from concurrency import SingleFlight, AdmissionController, AdmissionRejected, DeadlineExceeded, normalize_question
+from llm_service import LLMService, GenerationTimeout
+from profiling import RequestProfiler
+from query_log import QueryLog
 from flask import Flask, render_template, request, jsonify
 
+# Beengedés-szabályozás az LLM előtt
+LLM_MAX_CONCURRENT = int(os.getenv('LLM_MAX_CONCURRENT', '4'))
+LLM_MAX_QUEUE = int(os.getenv('LLM_MAX_QUEUE', '16'))
+# Egy /ask kérés teljes határideje másodpercben
+ASK_DEADLINE_SECONDS = float(os.getenv('ASK_DEADLINE_SECONDS', '30'))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv('ADMISSION_RETRY_AFTER_SECONDS', '5'))
+# Elutasítás helyett csak keresési találatokat adunk vissza, ha az LLM keret elfogyott
+ADMISSION_DEGRADED_MODE = os.getenv('ADMISSION_DEGRADED_MODE', '0') == '1'
+# /search végpont korlátai
+SEARCH_MAX_K = int(os.getenv('SEARCH_MAX_K', '50'))
+SEARCH_MAX_QUERIES = int(os.getenv('SEARCH_MAX_QUERIES', '32'))
+# Degradált válaszban megjelenített kódrészlet hossza
+DEGRADED_SNIPPET_CHARS = 300
+# Gépelés közbeni előtöltés: tárolt keresési eredmények száma, élettartama és a legrövidebb kérdés
+PREFETCH_CACHE_SIZE = int(os.getenv('PREFETCH_CACHE_SIZE', '256'))
+PREFETCH_TTL_SECONDS = float(os.getenv('PREFETCH_TTL_SECONDS', '120'))
+PREFETCH_MIN_CHARS = int(os.getenv('PREFETCH_MIN_CHARS', '8'))
+# Profilozás: a kérés fejléce (csak admin jogosultsággal), a mintavételezett /ask forgalom
+# aránya és a megőrzött profilok száma
+PROFILE_HEADER = 'X-Profile'
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_HISTORY = int(os.getenv('PROFILE_HISTORY', '20'))
+# Anonimizált lekérdezés napló (JSONL); üresen hagyva nincs naplózás
+QUERY_LOG_PATH = os.getenv('QUERY_LOG_PATH')
+# További projekt indexek: "nev=/forras/konyvtar,nev2=/masik/konyvtar"
+PROJECTS = os.getenv('PROJECTS', '')
+# A projekt nélküli kérések projektje, forrása a data könyvtár
+DEFAULT_PROJECT = 'default'
+# A memóriában tartott projekt indexek becsült kerete
+PROJECT_MEMORY_BUDGET_MB = int(os.getenv('PROJECT_MEMORY_BUDGET_MB', '1024'))
+# A projekt adatbázisok gyökérkönyvtára; megadva újraindítás után is megmarad
+# (pl. a snapshot.py import paranccsal előre feltöltött index), üresen ideiglenes könyvtár
+DB_DIR = os.getenv('DB_DIR')
+# Admin végpontok tokenje; ha nincs megadva, csak localhostról érhetők el
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
 class RAGAssistant:
     def __init__(self, auto_setup=False):
         """
@@ -53,89 +78,159 @@ class RAGAssistant:
         # Alapértelmezett könyvtárak
         self.data_dir = os.path.join(project_root, 'data')
         
-        # Use /tmp directory with unique name for database
-        unique_id = str(int(time.time()))
-        self.db_dir = os.path.join('/tmp', f'chroma_db_{unique_id}')
+        # Beállított, megőrzött adatbázis könyvtár, vagy egyedi nevű /tmp könyvtár
+        if DB_DIR:
+            self.db_dir = DB_DIR
+            os.makedirs(self.db_dir, exist_ok=True)
+        else:
+            unique_id = str(int(time.time()))
+            self.db_dir = os.path.join('/tmp', f'chroma_db_{unique_id}')
+            os.makedirs(self.db_dir, exist_ok=True)
+            
+            # Explicit permissions for tmp directory
+            os.chmod(self.db_dir, 0o777)
         
-        # Könyvtárak létrehozása, ha nem léteznek
+        # Forrás könyvtár létrehozása, ha nem létezik
         os.makedirs(self.data_dir, exist_ok=True)
-        os.makedirs(self.db_dir, exist_ok=True)
-        
-        # Explicit permissions for tmp directory
-        os.chmod(self.db_dir, 0o777)
         
         logger.info(f"Adatbázis létrehozva a következő helyen: {self.db_dir}")
         
+        # Projekt indexek: első használatkor nyílnak meg, memóriakeret felett a régóta nem használtak kiürülnek
+        projects = {DEFAULT_PROJECT: self.data_dir}
+        projects.update(parse_projects(PROJECTS))
+        self.projects = ProjectRegistry(
+            projects,
+            self.db_dir,
+            DEFAULT_PROJECT,
+            PROJECT_MEMORY_BUDGET_MB * 1024 * 1024,
+            snapshot_path=os.getenv('INDEX_SNAPSHOT')
+        )
+        logger.info(f"Regisztrált projektek: {', '.join(self.projects.names())}")
+        
         # Szolgáltatások inicializálása
-        self.document_db = DocumentDatabase(self.data_dir, self.db_dir)
         self.llm_service = LLMService()
         
-        # Opcionális adatbázis inicializálás
+        # Azonos, egyidőben futó kérdések összevonása
+        self.question_flight = SingleFlight(retry_after=ADMISSION_RETRY_AFTER_SECONDS)
+        # Keresési eredmények az előtöltéshez: a /ask az azonos (normalizált) kérdésnél újrahasználja,
+        # a futó előtöltéshez pedig csatlakozik
+        self.retrieval_cache = LRUCache(PREFETCH_CACHE_SIZE, ttl_seconds=PREFETCH_TTL_SECONDS)
+        self.retrieval_flight = SingleFlight(retry_after=ADMISSION_RETRY_AFTER_SECONDS)
+        # Opcionális lekérdezés napló a terheléses visszajátszáshoz
+        self.query_log = QueryLog(QUERY_LOG_PATH) if QUERY_LOG_PATH else None
+        # Kérésenként bekapcsolható profilozás
+        self.profiler = RequestProfiler(history=PROFILE_HISTORY, sample_rate=PROFILE_SAMPLE_RATE)
+        # Egyidejű LLM generálások korlátozása
+        self.llm_admission = AdmissionController(
+            LLM_MAX_CONCURRENT, LLM_MAX_QUEUE, ADMISSION_RETRY_AFTER_SECONDS
+        )
+        
+        # Opcionális adatbázis inicializálás: az alapértelmezett projekt megnyitása
+        # (előre elkészített pillanatképből ha van, különben frissítés a forrásokból)
         if auto_setup:
             try:
-                setup_result = self.document_db.check_and_update_if_needed()
-                if setup_result:
-                    logger.info("Adatbázis inicializálás vagy frissítés sikeres")
-                else:
-                    logger.warning("Adatbázis inicializálás vagy frissítés sikertelen")
+                self.projects.get(DEFAULT_PROJECT)
             except Exception as e:
                 logger.error(f"Adatbázis inicializálási hiba: {e}")
                 logger.error(traceback.format_exc())
     
-    def setup_assistant_database(self):
+    def setup_assistant_database(self, project=None):
         """
         Asszisztens adatbázisának létrehozása
         
+        :param project: Projekt név (None: alapértelmezett projekt)
         :return: Művelet sikeressége
         """
         try:
-            return self.document_db.setup_database()
+            with self.projects.use(project) as document_db:
+                return document_db.setup_database()
         except Exception as e:
             logger.error(f"Asszisztens adatbázis létrehozási hiba: {e}")
             logger.error(traceback.format_exc())
             raise
     
-    def delete_assistant_database(self):
+    def delete_assistant_database(self, project=None):
         """
         Asszisztens adatbázisának törlése
         
+        :param project: Projekt név (None: alapértelmezett projekt)
         :return: Művelet sikeressége
         """
         try:
-            self.document_db.delete_database()
+            with self.projects.use(project) as document_db:
+                document_db.delete_database()
             return True
         except Exception as e:
             logger.error(f"Asszisztens adatbázis törlési hiba: {e}")
             logger.error(traceback.format_exc())
             raise
     
-    def update_assistant_database(self, new_source_dir=None):
+    def update_assistant_database(self, new_source_dir=None, project=None):
         """
         Asszisztens adatbázisának frissítése
         
         :param new_source_dir: Opcionális új forrás könyvtár
+        :param project: Projekt név (None: alapértelmezett projekt)
         :return: Művelet sikeressége
         """
         try:
-            return self.document_db.update_database(new_source_dir)
+            with self.projects.use(project) as document_db:
+                if new_source_dir:
+                    # A projekt újranyitás után is az új könyvtárból épüljön
+                    self.projects.set_source_dir(project, new_source_dir)
+                return document_db.update_database(new_source_dir)
         except Exception as e:
             logger.error(f"Asszisztens adatbázis frissítési hiba: {e}")
             logger.error(traceback.format_exc())
             raise
     
-    def list_assistant_documents(self):
+    def list_assistant_documents(self, project=None):
         """
         Asszisztens dokumentumainak listázása
         
+        :param project: Projekt név (None: alapértelmezett projekt)
         :return: Dokumentumok listája
         """
         try:
-            return self.document_db.list_documents()
+            with self.projects.use(project) as document_db:
+                return document_db.list_documents()
         except Exception as e:
             logger.error(f"Asszisztens dokumentumok listázási hiba: {e}")
             logger.error(traceback.format_exc())
             raise
     
+    def search_documents(self, queries, k=5, filters=None, mode=None, duplicates='collapse', project=None):
+        """
+        Csak keresés (LLM hívás nélkül) egy vagy több lekérdezésre
+        
+        :param queries: Keresési lekérdezések listája
+        :param k: Lekérdezésenkénti találatszám
+        :param filters: Opcionális metaadat szűrők
+        :param mode: Keresési mód ('hybrid' vagy 'vector')
+        :param duplicates: Ismétlődő chunkok kezelése ('collapse' vagy 'expand')
+        :param project: Projekt név (None: alapértelmezett projekt)
+        :return: Lekérdezésenként a találatok listája
+        """
+        try:
+            with self.projects.use(project) as document_db:
+                return document_db.search(queries, k=k, filters=filters, mode=mode, duplicates=duplicates)
+        except UnknownProjectError:
+            raise
+        except Exception as e:
+            logger.error(f"Asszisztens keresési hiba: {e}")
+            logger.error(traceback.format_exc())
+            raise
+    
+    def assistant_documents_version(self, project=None):
+        """
+        Asszisztens dokumentumlistájának azonosítója
+        
+        :param project: Projekt név (None: alapértelmezett projekt)
+        :return: A fájllistából képzett hash
+        """
+        with self.projects.use(project) as document_db:
+            return document_db.documents_version()
+    
     def process_question(self, query):
         """
         Kérdés feldolgozása RAG módszerrel
@@ -143,18 +238,176 @@ class RAGAssistant:
         :param query: Felhasználói kérdés
         :return: Generált válasz
         """
+        return self.answer_question(query)["response"]
+    
+    def answer_question(self, query, deadline=None, project=None):
+        """
+        Kérdés feldolgozása RAG módszerrel, részletes eredménnyel
+        
+        Az egyidőben érkező azonos kérdések (projekt, normalizált szöveg és
+        index verzió alapján) egyetlen feldolgozáson osztoznak; a csatlakozók
+        legfeljebb a saját határidejükig várnak.
+        
+        :param query: Felhasználói kérdés
+        :param deadline: Abszolút határidő time.monotonic() szerint
+        :param project: Projekt név (None: alapértelmezett projekt)
+        :return: Szótár: response, degraded, sources, timings
+        :raises AdmissionRejected: Ha az LLM keret elfogyott vagy a határidő lejárt, és nincs degradált mód
+        :raises UnknownProjectError: Ismeretlen projekt név esetén
+        """
+        project = project or DEFAULT_PROJECT
+        with self.projects.use(project) as document_db:
+            key = (project, normalize_question(query), document_db.index_version)
+            return self.question_flight.do(
+                key, lambda: self._answer_question(query, deadline, document_db, key), deadline=deadline
+            )
+    
+    def prefetch(self, query, project=None):
+        """
+        Keresés előre, gépelés közben; az eredményt a későbbi /ask újrahasználja
+        
+        :param query: A félkész vagy kész kérdés
+        :param project: Projekt név (None: alapértelmezett projekt)
+        :return: (találatok Document listája, gyorsítótárból jött-e)
+        :raises UnknownProjectError: Ismeretlen projekt név esetén
+        """
+        project = project or DEFAULT_PROJECT
+        with self.projects.use(project) as document_db:
+            key = (project, normalize_question(query), document_db.index_version)
+            return self._retrieve(query, document_db, key)
+    
+    def _retrieve(self, query, document_db, key, deadline=None):
+        """
+        Hasonlósági keresés a gyorsítótáron és az azonos, futó kereséseken keresztül
+        
+        :param query: Keresési lekérdezés
+        :param document_db: A kérdezett projekt indexe
+        :param key: (projekt, normalizált kérdés, index verzió)
+        :param deadline: Egy futó azonos keresés megvárásának határideje
+        :return: (találatok Document listája, gyorsítótárból jött-e)
+        """
+        context_docs = self.retrieval_cache.get(key)
+        if context_docs is not None:
+            return context_docs, True
+        context_docs = self.retrieval_flight.do(key, lambda: document_db.similarity_search(query), deadline=deadline)
+        # Üres eredmény hiba is lehet, azt nem tároljuk
+        if context_docs:
+            self.retrieval_cache.put(key, context_docs)
+        return context_docs, False
+    
+    def _answer_question(self, query, deadline, document_db, key):
+        """
+        Egy kérdés tényleges feldolgozása: keresés és beengedés után válaszgenerálás
+        
+        :param query: Felhasználói kérdés
+        :param deadline: Abszolút határidő time.monotonic() szerint
+        :param document_db: A kérdezett projekt indexe
+        :param key: (projekt, normalizált kérdés, index verzió)
+        :return: Szótár: response, degraded, sources, timings (szakaszonként, mp), retrieval_cached
+        """
         try:
-            # Kontextus lekérése hasonlósági kereséssel
-            context_docs = self.document_db.similarity_search(query)
+            timings = {}
+            started = time.perf_counter()
             
-            # Válasz generálása LLM segítségével
-            response = self.llm_service.generate_response(query, context_docs)
+            # Kontextus lekérése hasonlósági kereséssel (vagy az előtöltött eredményből)
+            context_docs, retrieval_cached = self._retrieve(query, document_db, key, deadline)
+            timings["retrieval"] = time.perf_counter() - started
+            sources = [
+                {
+                    "filepath": doc.metadata.get('filepath'),
+                    "chunk_index": doc.metadata.get('chunk_index'),
+                    "snippet": doc.page_content[:DEGRADED_SNIPPET_CHARS]
+                }
+                for doc in context_docs
+            ]
             
-            return response
+            # Válasz generálása LLM segítségével, ha van szabad keret
+            stage_start = time.perf_counter()
+            try:
+                self.llm_admission.acquire(deadline)
+            except AdmissionRejected as e:
+                if not ADMISSION_DEGRADED_MODE:
+                    raise
+                logger.warning(f"LLM keret elfogyott, csak keresési találatok visszaadása: {e}")
+                timings["admission_wait"] = time.perf_counter() - stage_start
+                timings["total"] = time.perf_counter() - started
+                return {
+                    "response": self._format_retrieval_only_response(sources),
+                    "degraded": True,
+                    "sources": sources,
+                    "timings": timings,
+                    "retrieval_cached": retrieval_cached
+                }
+            timings["admission_wait"] = time.perf_counter() - stage_start
+            
+            # A generálás a kérés határidejéből megmaradt időt kapja
+            stage_start = time.perf_counter()
+            try:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                response = self.llm_service.generate_response(query, context_docs, timeout=remaining)
+            except GenerationTimeout as e:
+                timings["generation"] = time.perf_counter() - stage_start
+                timings["total"] = time.perf_counter() - started
+                if not ADMISSION_DEGRADED_MODE:
+                    raise DeadlineExceeded(f"A válasz generálása túllépte a határidőt: {e}",
+                                           503, ADMISSION_RETRY_AFTER_SECONDS)
+                logger.warning(f"Generálási határidő lejárt, csak keresési találatok visszaadása: {e}")
+                return {
+                    "response": self._format_retrieval_only_response(sources),
+                    "degraded": True,
+                    "sources": sources,
+                    "timings": timings,
+                    "retrieval_cached": retrieval_cached
+                }
+            finally:
+                self.llm_admission.release()
+            timings["generation"] = time.perf_counter() - stage_start
+            timings["total"] = time.perf_counter() - started
+            
+            return {
+                "response": response,
+                "degraded": False,
+                "sources": sources,
+                "timings": timings,
+                "retrieval_cached": retrieval_cached
+            }
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"Kérdés feldolgozási hiba: {e}")
             logger.error(traceback.format_exc())
             raise
+    
+    def _format_retrieval_only_response(self, sources):
+        """
+        Csak keresési találatokból álló markdown válasz összeállítása
+        
+        :param sources: Találatok (filepath, snippet) listája
+        :return: Markdown szöveg
+        """
+        if not sources:
+            return "A nyelvi modell jelenleg túlterhelt, és nem találtunk releváns dokumentumot."
+        parts = ["A nyelvi modell jelenleg túlterhelt, ezért csak a legrelevánsabb találatokat mutatjuk:"]
+        for source in sources:
+            parts.append(f"**{source['filepath']}**\n\n```\n{source['snippet']}\n```")
+        return "\n\n".join(parts)
+    
+    def get_stats(self):
+        """
+        Futásidejű számlálók lekérése
+        
+        :return: Statisztikák szótára
+        """
+        with self.projects.use(DEFAULT_PROJECT) as document_db:
+            return {
+                "question_coalescing": self.question_flight.stats(),
+                "retrieval_cache": dict(self.retrieval_cache.stats(), coalesced=self.retrieval_flight.stats()["coalesced"]),
+                "query_embedding_cache": document_db.embeddings.query_cache.stats(),
+                "llm_admission": self.llm_admission.stats(),
+                "ingestion": document_db.last_ingest_stats,
+                "index_version": document_db.index_version,
+                "projects": self.projects.stats()
+            }
 
 # Flask alkalmazás létrehozása
 app = Flask(__name__, 
@@ -162,7 +415,54 @@ app = Flask(__name__,
             static_folder=os.path.join(project_root, 'static'))
 
 # RAG asszisztens inicializálása auto_setup=True beállítással
-rag_assistant = RAGAssistant(auto_setup=True)
+# A többprocesszes beágyazás spawn módban indított workerei __mp_main__ néven
+# újra importálják ezt a modult, bennük nem szabad újabb asszisztenst indítani
+if __name__ != '__mp_main__':
+    rag_assistant = RAGAssistant(auto_setup=True)
+
+def _profile_requested():
+    """
+    A profilozás (cProfile és a folyamat egészét lassító tracemalloc) fejléccel
+    csak admin jogosultsággal kérhető; egyébként csak a mintavételezés indítja
+
+    :return: True ha a kérés X-Profile fejléccel profilozást kért és jogosult rá
+    """
+    if request.headers.get(PROFILE_HEADER, '').lower() not in ('1', 'true', 'yes'):
+        return False
+    return _admin_authorized()
+
+def _with_profile_id(response, profile_record):
+    """
+    A profil azonosítójának visszaküldése X-Profile-Id fejlécben
+    """
+    if profile_record is not None:
+        response.headers['X-Profile-Id'] = profile_record.id
+    return response
+
+def _requested_project(data):
+    """
+    :param data: A kérés JSON törzse vagy query paraméterei
+    :return: A kért projekt neve, vagy None az alapértelmezett projekthez
+    """
+    project = data.get('project')
+    return str(project) if project else None
+
+def _unknown_project_response(e):
+    """
+    :return: 404-es JSON válasz ismeretlen projekt esetén
+    """
+    return jsonify({
+        "status": "error", 
+        "message": f"Ismeretlen projekt: {e.args[0]}"
+    }), 404
+
+def _admin_authorized():
+    """
+    :return: True ha a kérés hozzáférhet az admin végpontokhoz
+    """
+    if ADMIN_TOKEN:
+        return hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN)
+    return request.remote_addr in ('127.0.0.1', '::1')
 
 @app.route('/')
 def index():
@@ -178,14 +478,42 @@ def list_documents():
     """
     Dokumentumok listázásának végpontja
     
+    Opcionális lapozás az offset és limit query paraméterekkel.
+    ETag fejlécet ad vissza, egyező If-None-Match esetén 304-gyel válaszol.
+    
     :return: JSON válasz a dokumentumok listájával
     """
     try:
-        documents = rag_assistant.list_assistant_documents()
-        return jsonify({
+        try:
+            offset = max(int(request.args.get('offset', 0)), 0)
+            limit = request.args.get('limit')
+            limit = max(int(limit), 0) if limit is not None else None
+        except ValueError:
+            return jsonify({
+                "status": "error", 
+                "message": "Az offset és limit paraméternek egész számnak kell lennie"
+            }), 400
+        
+        project = _requested_project(request.args)
+        etag = f"{project or DEFAULT_PROJECT}-{rag_assistant.assistant_documents_version(project)}-{offset}-{limit}"
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        
+        documents = rag_assistant.list_assistant_documents(project)
+        page = documents[offset:offset + limit] if limit is not None else documents[offset:]
+        response = jsonify({
             "status": "success", 
-            "documents": documents
+            "documents": page,
+            "total": len(documents),
+            "offset": offset,
+            "limit": limit
         })
+        response.set_etag(etag)
+        return response
+    except UnknownProjectError as e:
+        return _unknown_project_response(e)
     except Exception as e:
         logger.error(f"Dokumentumok listázási hiba: {e}")
         logger.error(traceback.format_exc())
@@ -202,11 +530,16 @@ def handle_setup_database_request():
     :return: JSON válasz a művelet sikerességéről
     """
     try:
-        success = rag_assistant.setup_assistant_database()
-        return jsonify({
+        project = _requested_project(request.get_json(silent=True) or {})
+        with rag_assistant.profiler.profile('setup-database', enabled=_profile_requested(),
+                                            project=project) as profile_record:
+            success = rag_assistant.setup_assistant_database(project)
+        return _with_profile_id(jsonify({
             "status": "success" if success else "error", 
             "message": "Adatbázis sikeresen létrehozva" if success else "Nem sikerült az adatbázis létrehozása"
-        })
+        }), profile_record)
+    except UnknownProjectError as e:
+        return _unknown_project_response(e)
     except Exception as e:
         logger.error(f"Adatbázis létrehozási hiba: {e}")
         logger.error(traceback.format_exc())
@@ -223,11 +556,13 @@ def handle_delete_database_request():
     :return: JSON válasz a művelet sikerességéről
     """
     try:
-        rag_assistant.delete_assistant_database()
+        rag_assistant.delete_assistant_database(_requested_project(request.get_json(silent=True) or {}))
         return jsonify({
             "status": "success", 
             "message": "Adatbázis sikeresen törölve"
         })
+    except UnknownProjectError as e:
+        return _unknown_project_response(e)
     except Exception as e:
         logger.error(f"Adatbázis törlési hiba: {e}")
         logger.error(traceback.format_exc())
@@ -249,11 +584,16 @@ def handle_update_database_request():
             data = {}  # Üres objektum, ha nincs kérés body
             
         new_source_dir = data.get('source_dir')
-        success = rag_assistant.update_assistant_database(new_source_dir)
-        return jsonify({
+        project = _requested_project(data)
+        with rag_assistant.profiler.profile('update-database', enabled=_profile_requested(),
+                                            project=project) as profile_record:
+            success = rag_assistant.update_assistant_database(new_source_dir, project)
+        return _with_profile_id(jsonify({
             "status": "success" if success else "error", 
             "message": "Adatbázis sikeresen frissítve" if success else "Nem sikerült az adatbázis frissítése"
-        })
+        }), profile_record)
+    except UnknownProjectError as e:
+        return _unknown_project_response(e)
     except Exception as e:
         logger.error(f"Adatbázis frissítési hiba: {e}")
         logger.error(traceback.format_exc())
@@ -279,7 +619,9 @@ def handle_question():
             }), 400
         
         question = data.get('question', '').strip()
-        logger.info(f"Beérkező kérdés: '{question}'")
+        project = _requested_project(data)
+        logger.info(f"Beérkező kérdés ({len(question)} karakter, projekt: {project or DEFAULT_PROJECT})")
+        logger.debug(f"Kérdés szövege: '{question}'")
         
         # Üres kérdés ellenőrzése
         if not question:
@@ -290,14 +632,52 @@ def handle_question():
             }), 400
         
         # Válasz generálása
+        request_start = time.perf_counter()
         try:
-            response = rag_assistant.process_question(question)
+            deadline = time.monotonic() + ASK_DEADLINE_SECONDS
+            profile_enabled = rag_assistant.profiler.should_profile(_profile_requested())
+            with rag_assistant.profiler.profile('ask', enabled=profile_enabled, project=project,
+                                                question_chars=len(question)) as profile_record:
+                result = rag_assistant.answer_question(question, deadline=deadline, project=project)
+            response = result["response"]
             logger.info(f"Válasz sikeresen legenerálva ({len(response)} karakter)")
             
-            return jsonify({
+            if rag_assistant.query_log is not None:
+                timings = dict(result["timings"], request=time.perf_counter() - request_start)
+                rag_assistant.query_log.record(
+                    question,
+                    200,
+                    timings={stage: round(seconds, 4) for stage, seconds in timings.items()},
+                    retrieved_files=[source["filepath"] for source in result["sources"]],
+                    response_chars=len(response),
+                    degraded=result["degraded"],
+                    project=project,
+                    retrieval_cached=result["retrieval_cached"]
+                )
+            
+            return _with_profile_id(jsonify({
                 "status": "success", 
-                "response": response
+                "response": response,
+                "degraded": result["degraded"]
+            }), profile_record)
+        except AdmissionRejected as e:
+            logger.warning(f"Kérés elutasítva ({e.status_code}): {e}")
+            if rag_assistant.query_log is not None:
+                rag_assistant.query_log.record(
+                    question,
+                    e.status_code,
+                    timings={"request": round(time.perf_counter() - request_start, 4)},
+                    project=project
+                )
+            rejection = jsonify({
+                "status": "error", 
+                "message": f"A szolgáltatás túlterhelt: {str(e)}"
             })
+            rejection.status_code = e.status_code
+            rejection.headers['Retry-After'] = str(e.retry_after)
+            return rejection
+        except UnknownProjectError as e:
+            return _unknown_project_response(e)
         except Exception as e:
             logger.error(f"Kérdés feldolgozási hiba: {e}")
             logger.error(traceback.format_exc())
@@ -314,5 +694,224 @@ def handle_question():
             "message": str(e)
         }), 500
 
+@app.route('/prefetch', methods=['POST'])
+def handle_prefetch_request():
+    """
+    Gépelés közbeni előtöltés végpontja
+    
+    Lefuttatja (vagy a gyorsítótárból veszi) a kérdéshez tartozó keresést,
+    így a beküldött /ask már nem vár a beágyazásra és a vektoros keresésre.
+    Kérés: {"question": "...", "project": "..."}
+    
+    :return: JSON válasz a találati fájlok előnézetével
+    """
+    try:
+        data = request.get_json(silent=True)
+        if data is None:
+            return jsonify({
+                "status": "error", 
+                "message": "Érvénytelen JSON vagy üres kérés"
+            }), 400
+        
+        question = data.get('question', '')
+        if not isinstance(question, str):
+            return jsonify({
+                "status": "error", 
+                "message": "A question mezőnek szövegnek kell lennie"
+            }), 400
+        question = question.strip()
+        if len(question) < PREFETCH_MIN_CHARS:
+            return jsonify({"status": "success", "files": [], "cached": False})
+        
+        context_docs, cached = rag_assistant.prefetch(question, project=_requested_project(data))
+        files = []
+        for doc in context_docs:
+            filepath = doc.metadata.get('filepath')
+            if filepath not in files:
+                files.append(filepath)
+        return jsonify({
+            "status": "success",
+            "files": files,
+            "cached": cached
+        })
+    except UnknownProjectError as e:
+        return _unknown_project_response(e)
+    except Exception as e:
+        logger.error(f"Előtöltési hiba: {e}")
+        logger.error(traceback.format_exc())
+        return jsonify({
+            "status": "error", 
+            "message": str(e)
+        }), 500
+
+@app.route('/search', methods=['POST'])
+def handle_search_request():
+    """
+    Csak keresés végpontja (LLM hívás nélkül)
+    
+    Kérés: {"query": "..."} vagy {"queries": [...]}, opcionálisan "k" és
+    "filters": {"path_prefix": "...", "extensions": [...], "modified_since": <unix idő>}
+    "mode": "hybrid" | "vector", "duplicates": "collapse" | "expand" és "project"
+    
+    :return: JSON válasz a rangsorolt chunkokkal
+    """
+    try:
+        data = request.get_json(silent=True)
+        if data is None:
+            return jsonify({
+                "status": "error", 
+                "message": "Érvénytelen JSON vagy üres kérés"
+            }), 400
+        
+        batched = 'queries' in data
+        queries = data.get('queries') if batched else [data.get('query', '')]
+        if (not isinstance(queries, list) or not queries or
+                not all(isinstance(q, str) and q.strip() for q in queries)):
+            return jsonify({
+                "status": "error", 
+                "message": "A query/queries mező nem lehet üres"
+            }), 400
+        if len(queries) > SEARCH_MAX_QUERIES:
+            return jsonify({
+                "status": "error", 
+                "message": f"Legfeljebb {SEARCH_MAX_QUERIES} lekérdezés küldhető egyszerre"
+            }), 400
+        
+        filters = data.get('filters') or {}
+        try:
+            k = int(data.get('k', 5))
+            if not isinstance(filters, dict):
+                raise ValueError("filters")
+            if isinstance(filters.get('extensions'), str):
+                filters['extensions'] = [filters['extensions']]
+            if filters.get('modified_since') is not None:
+                filters['modified_since'] = float(filters['modified_since'])
+        except (TypeError, ValueError):
+            return jsonify({
+                "status": "error", 
+                "message": "Érvénytelen k vagy filters paraméter"
+            }), 400
+        k = min(max(k, 1), SEARCH_MAX_K)
+        
+        mode = data.get('mode')
+        if mode not in (None, 'hybrid', 'vector'):
+            return jsonify({
+                "status": "error", 
+                "message": "A mode értéke 'hybrid' vagy 'vector' lehet"
+            }), 400
+        
+        duplicates = data.get('duplicates', 'collapse')
+        if duplicates not in ('collapse', 'expand'):
+            return jsonify({
+                "status": "error", 
+                "message": "A duplicates értéke 'collapse' vagy 'expand' lehet"
+            }), 400
+        
+        results = rag_assistant.search_documents(
+            [q.strip() for q in queries], k=k, filters=filters, mode=mode, duplicates=duplicates,
+            project=_requested_project(data)
+        )
+        formatted = [
+            [
+                {
+                    "content": hit["content"],
+                    "filepath": hit["metadata"].get("filepath"),
+                    "chunk_index": hit["metadata"].get("chunk_index"),
+                    "distance": hit["distance"],
+                    "retrieval": hit.get("retrieval"),
+                    "references": [
+                        {"filepath": ref.get("filepath"), "chunk_index": ref.get("chunk_index")}
+                        for ref in hit.get("references", [])
+                    ]
+                }
+                for hit in hits
+            ]
+            for hits in results
+        ]
+        return jsonify({
+            "status": "success",
+            "results": formatted if batched else formatted[0]
+        })
+    except UnknownProjectError as e:
+        return _unknown_project_response(e)
+    except Exception as e:
+        logger.error(f"Keresési hiba: {e}")
+        logger.error(traceback.format_exc())
+        return jsonify({
+            "status": "error", 
+            "message": str(e)
+        }), 500
+
+@app.route('/stats', methods=['GET'])
+def handle_stats_request():
+    """
+    Futásidejű statisztikák végpontja
+    
+    :return: JSON válasz a számlálókkal
+    """
+    try:
+        return jsonify({
+            "status": "success",
+            "stats": rag_assistant.get_stats()
+        })
+    except Exception as e:
+        logger.error(f"Statisztika lekérési hiba: {e}")
+        logger.error(traceback.format_exc())
+        return jsonify({
+            "status": "error", 
+            "message": str(e)
+        }), 500
+
+@app.route('/admin/profiles', methods=['GET'])
+def handle_list_profiles_request():
+    """
+    A megőrzött profilok listája
+    
+    :return: JSON válasz a profilok rövid leírásával
+    """
+    if not _admin_authorized():
+        return jsonify({"status": "error", "message": "Hozzáférés megtagadva"}), 403
+    return jsonify({
+        "status": "success",
+        "profiles": rag_assistant.profiler.list()
+    })
+
+@app.route('/admin/profiles/<profile_id>', methods=['GET'])
+def handle_get_profile_request(profile_id):
+    """
+    Egy profil részletei (cProfile kivonat és tracemalloc különbség)
+    
+    :param profile_id: Profil azonosító
+    :return: JSON válasz a profil tartalmával
+    """
+    if not _admin_authorized():
+        return jsonify({"status": "error", "message": "Hozzáférés megtagadva"}), 403
+    record = rag_assistant.profiler.get(profile_id)
+    if record is None:
+        return jsonify({"status": "error", "message": "Nincs ilyen profil"}), 404
+    return jsonify({
+        "status": "success",
+        "profile": record.to_dict()
+    })
+
+@app.route('/admin/profiles/<profile_id>/download', methods=['GET'])
+def handle_download_profile_request(profile_id):
+    """
+    Egy profil letöltése pstats formátumban (pstats, snakeviz)
+    
+    :param profile_id: Profil azonosító
+    :return: .prof fájl
+    """
+    if not _admin_authorized():
+        return jsonify({"status": "error", "message": "Hozzáférés megtagadva"}), 403
+    record = rag_assistant.profiler.get(profile_id)
+    if record is None or not record.stats_raw:
+        return jsonify({"status": "error", "message": "Nincs ilyen profil"}), 404
+    return app.response_class(
+        record.stats_raw,
+        mimetype='application/octet-stream',
+        headers={'Content-Disposition': f'attachment; filename=profile-{record.id}.prof'}
+    )
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080, debug=True)
\ No newline at end of file
@@ -0,0 +1,171 @@
+import io
+import time
+import uuid
+import random
+import pstats
+import marshal
+import cProfile
+import threading
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# A pstats szöveges kivonatában megjelenített függvények száma
+PROFILE_TOP_FUNCTIONS = 40
+# A tracemalloc különbségben megjelenített sorok száma
+PROFILE_TOP_ALLOCATIONS = 20
+
+
+class ProfileRecord:
+    """
+    Egy profilozott művelet eredménye
+    """
+    def __init__(self, name, meta):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.meta = meta
+        self.started_at = time.time()
+        self.duration = None
+        self.stats_text = ""
+        self.stats_raw = b""
+        self.allocations = []
+        self.traced_peak_bytes = None
+
+    def summary(self):
+        """
+        :return: A profil rövid leírása listázáshoz
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "meta": self.meta,
+            "started_at": self.started_at,
+            "duration": self.duration
+        }
+
+    def to_dict(self):
+        """
+        :return: A profil teljes, JSON-ként küldhető tartalma
+        """
+        return dict(
+            self.summary(),
+            stats=self.stats_text,
+            allocations=self.allocations,
+            traced_peak_bytes=self.traced_peak_bytes
+        )
+
+
+class RequestProfiler:
+    """
+    Kérésenként bekapcsolható cProfile és tracemalloc mérés
+
+    Az utolsó history darab profil a memóriában marad letöltéshez.
+    A tracemalloc folyamatszintű, ezért egyidejű profilozott kéréseknél
+    a foglalási különbségek egymás foglalásait is tartalmazhatják.
+    """
+    def __init__(self, history=20, sample_rate=0.0):
+        """
+        :param history: Megőrzött profilok száma
+        :param sample_rate: A kérés nélkül is profilozott forgalom aránya (0..1)
+        """
+        self.history = history
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._records = OrderedDict()
+        self._tracemalloc_users = 0
+        self._owns_tracemalloc = False
+
+    def should_profile(self, requested=False):
+        """
+        :param requested: A kérés kifejezetten profilozást kért-e
+        :return: True ha a műveletet profilozni kell
+        """
+        return requested or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    @contextmanager
+    def profile(self, name, enabled=True, **meta):
+        """
+        Kódblokk profilozása
+
+        :param name: A profilozott művelet neve
+        :param enabled: Ha False, a blokk mérés nélkül fut
+        :param meta: A profilhoz csatolt további adatok
+        :return: A ProfileRecord (a blokk végén töltődik ki), vagy None
+        """
+        if not enabled:
+            yield None
+            return
+
+        record = ProfileRecord(name, meta)
+        self._start_tracemalloc()
+        before = tracemalloc.take_snapshot()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            profiling = True
+        except ValueError:
+            # Ugyanezen a szálon már fut egy másik profilozó
+            profiling = False
+        try:
+            yield record
+        finally:
+            if profiling:
+                profiler.disable()
+            record.duration = time.perf_counter() - start
+            after = tracemalloc.take_snapshot()
+            record.traced_peak_bytes = tracemalloc.get_traced_memory()[1]
+            self._stop_tracemalloc()
+            self._fill_record(record, profiler if profiling else None, before, after)
+            self._store(record)
+
+    def list(self):
+        """
+        :return: A megőrzött profilok rövid leírása, legújabb elöl
+        """
+        with self._lock:
+            return [record.summary() for record in reversed(self._records.values())]
+
+    def get(self, profile_id):
+        """
+        :param profile_id: Profil azonosító
+        :return: ProfileRecord vagy None
+        """
+        with self._lock:
+            return self._records.get(profile_id)
+
+    def _fill_record(self, record, profiler, before, after):
+        record.allocations = [
+            str(diff) for diff in after.compare_to(before, 'lineno')[:PROFILE_TOP_ALLOCATIONS]
+        ]
+        if profiler is None:
+            record.stats_text = "A cProfile nem indult el (másik profilozó aktív)"
+            return
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        record.stats_text = stream.getvalue()
+        # A pstats/snakeviz által betölthető formátum (pstats.Stats.dump_stats megfelelője)
+        record.stats_raw = marshal.dumps(stats.stats)
+
+    def _store(self, record):
+        with self._lock:
+            self._records[record.id] = record
+            while len(self._records) > self.history:
+                self._records.popitem(last=False)
+
+    def _start_tracemalloc(self):
+        with self._lock:
+            if self._tracemalloc_users == 0:
+                # Kívülről indított tracemalloc-ot nem állítunk le
+                self._owns_tracemalloc = not tracemalloc.is_tracing()
+                if self._owns_tracemalloc:
+                    tracemalloc.start()
+            self._tracemalloc_users += 1
+
+    def _stop_tracemalloc(self):
+        with self._lock:
+            self._tracemalloc_users -= 1
+            if self._tracemalloc_users == 0 and self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
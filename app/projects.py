@@ -0,0 +1,245 @@
+import os
+import re
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from database import DocumentDatabase
+
+# Projekt nevek: ChromaDB collection névként és könyvtárnévként is használhatók
+PROJECT_NAME_RE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_-]{0,39}$')
+
+
+def project_db_dir(db_root, name):
+    """
+    :param db_root: A projekt adatbázisok közös gyökérkönyvtára
+    :param name: Projekt név
+    :return: A projekt ChromaDB könyvtára
+    """
+    return os.path.join(db_root, name)
+
+
+def project_collection_name(name):
+    """
+    :param name: Projekt név
+    :return: A projekt ChromaDB collectionjének neve
+    """
+    return f"project_{name}"
+
+
+class UnknownProjectError(KeyError):
+    """
+    Nem regisztrált projekt név
+    """
+
+
+def parse_projects(spec):
+    """
+    Projekt lista feldolgozása
+
+    :param spec: "nev=/forras/konyvtar,nev2=/masik/konyvtar" formájú szöveg
+    :return: Szótár: projekt név -> forrás könyvtár
+    :raises ValueError: Érvénytelen projekt név esetén
+    """
+    projects = {}
+    for item in spec.split(','):
+        if '=' not in item:
+            continue
+        name, source_dir = (part.strip() for part in item.split('=', 1))
+        if not PROJECT_NAME_RE.match(name):
+            raise ValueError(f"Érvénytelen projekt név: {name}")
+        projects[name] = source_dir
+    return projects
+
+
+class ProjectRegistry:
+    """
+    Több, egymástól független projekt index kezelése
+
+    Minden projektnek saját forrás könyvtára, ChromaDB könyvtára és
+    collectionje van. Az indexek első használatkor nyílnak meg (szükség esetén
+    felépülnek), és ha a becsült memóriaigényük összege túllépi a keretet,
+    a legrégebben használt projektek kikerülnek a memóriából: a ChromaDB
+    rendszerük leáll, amint az éppen futó kéréseik (use) befejeződtek.
+    A perzisztens index a lemezen marad, így az újranyitás nem igényel
+    újrabeágyazást.
+    """
+    def __init__(self, projects, db_root, default_project, memory_budget_bytes, snapshot_path=None):
+        """
+        :param projects: Szótár: projekt név -> forrás könyvtár
+        :param db_root: A projekt adatbázisok közös gyökérkönyvtára
+        :param default_project: A projekt megadása nélküli kérések projektje
+        :param memory_budget_bytes: A megnyitott indexek becsült memóriakerete
+        :param snapshot_path: Opcionális pillanatkép az alapértelmezett projekt első megnyitásához
+        """
+        self.projects = dict(projects)
+        self.db_root = db_root
+        self.default_project = default_project
+        self.memory_budget_bytes = memory_budget_bytes
+        self.snapshot_path = snapshot_path
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._open = OrderedDict()
+        self._open_locks = {name: threading.Lock() for name in self.projects}
+        self._embeddings = None
+        # Használatban lévő példányok (id -> használók száma) és a rájuk váró lezárások
+        self._users = {}
+        self._pending_close = {}
+        self.opened = 0
+        self.evicted = 0
+
+    def names(self):
+        """
+        :return: A regisztrált projektek nevei
+        """
+        return list(self.projects)
+
+    def get(self, name=None) -> DocumentDatabase:
+        """
+        Projekt index lekérése, szükség esetén megnyitása
+
+        :param name: Projekt név (None: alapértelmezett projekt)
+        :return: A projekt DocumentDatabase példánya
+        :raises UnknownProjectError: Ismeretlen projekt név esetén
+        """
+        name = name or self.default_project
+        if name not in self.projects:
+            raise UnknownProjectError(name)
+
+        with self._lock:
+            document_db = self._open.get(name)
+            if document_db is not None:
+                self._open.move_to_end(name)
+                return document_db
+
+        # A megnyitás (és esetleges építés) projektenként sorban, a többi projektet nem blokkolva
+        with self._open_locks[name]:
+            with self._lock:
+                document_db = self._open.get(name)
+                if document_db is not None:
+                    self._open.move_to_end(name)
+                    return document_db
+
+            document_db = self._open_project(name)
+
+            with self._lock:
+                self._open[name] = document_db
+                self.opened += 1
+            self._evict_over_budget(keep=name)
+            return document_db
+
+    @contextmanager
+    def use(self, name=None):
+        """
+        Projekt index használata; a blokk végéig a példány nem zárható le
+
+        :param name: Projekt név (None: alapértelmezett projekt)
+        :return: A projekt DocumentDatabase példánya
+        :raises UnknownProjectError: Ismeretlen projekt név esetén
+        """
+        name = name or self.default_project
+        while True:
+            document_db = self.get(name)
+            with self._lock:
+                # A két lépés között kiürített példány helyett újranyitjuk
+                if self._open.get(name) is document_db:
+                    self._users[id(document_db)] = self._users.get(id(document_db), 0) + 1
+                    break
+        try:
+            yield document_db
+        finally:
+            close_now = False
+            with self._lock:
+                users = self._users[id(document_db)] - 1
+                if users:
+                    self._users[id(document_db)] = users
+                else:
+                    del self._users[id(document_db)]
+                    close_now = self._pending_close.pop(id(document_db), None) is not None
+            if close_now:
+                document_db.close()
+
+    def set_source_dir(self, name, source_dir):
+        """
+        Projekt forrás könyvtárának módosítása (újranyitáskor is érvényes marad)
+
+        :param name: Projekt név (None: alapértelmezett projekt)
+        :param source_dir: Új forrás könyvtár
+        """
+        name = name or self.default_project
+        if name not in self.projects:
+            raise UnknownProjectError(name)
+        self.projects[name] = source_dir
+
+    def _open_project(self, name):
+        self.logger.info(f"Projekt index megnyitása: {name}")
+        document_db = DocumentDatabase(
+            self.projects[name],
+            project_db_dir(self.db_root, name),
+            collection_name=project_collection_name(name),
+            embeddings=self._embeddings
+        )
+        if self._embeddings is None:
+            # Az embedding modellt a projektek megosztják
+            self._embeddings = document_db.embeddings
+
+        # A pillanatkép csak üres indexet tölt fel; a megőrzött (DB_DIR) indexet a forrásokhoz igazítjuk
+        if (name == self.default_project and self.snapshot_path and os.path.exists(self.snapshot_path)
+                and document_db.chunk_count() == 0):
+            if document_db.import_snapshot(self.snapshot_path):
+                self.logger.info(f"Projekt index betöltve pillanatképből: {self.snapshot_path}")
+                return document_db
+            self.logger.warning("Pillanatkép betöltése sikertelen, index építése a forrásokból")
+
+        if not document_db.check_and_update_if_needed():
+            self.logger.warning(f"Projekt index inicializálás vagy frissítés sikertelen: {name}")
+        return document_db
+
+    def _evict_over_budget(self, keep):
+        to_close = []
+        with self._lock:
+            estimates = {name: db.estimate_memory_bytes() for name, db in self._open.items()}
+            total = sum(estimates.values())
+            for name in list(self._open):
+                if total <= self.memory_budget_bytes:
+                    break
+                if name == keep:
+                    continue
+                document_db = self._open.pop(name)
+                # Az újranyitott példány ne a lezárásra váró rendszert kapja meg
+                document_db.detach()
+                total -= estimates[name]
+                self.evicted += 1
+                # Futó kérés esetén az utolsó használó zárja le
+                if id(document_db) in self._users:
+                    self._pending_close[id(document_db)] = document_db
+                else:
+                    to_close.append(document_db)
+                self.logger.info(
+                    f"Projekt index kiürítve a memóriából: {name} "
+                    f"(~{estimates[name] / 1024 / 1024:.1f} MB)"
+                )
+        for document_db in to_close:
+            document_db.close()
+
+    def stats(self):
+        """
+        :return: Megnyitott projektek becsült memóriaigénye és a nyitási/kiürítési számlálók
+        """
+        with self._lock:
+            open_projects = {
+                name: {
+                    "estimated_bytes": db.estimate_memory_bytes(),
+                    "index_version": db.index_version
+                }
+                for name, db in self._open.items()
+            }
+            return {
+                "projects": self.names(),
+                "open": open_projects,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "opened": self.opened,
+                "evicted": self.evicted
+            }
@@ -0,0 +1,89 @@
+import re
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+# Személyes vagy titkos adatnak tűnő részletek a kérdésekben
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+IP_RE = re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}\b')
+SECRET_RE = re.compile(r'\b(?:sk-[\w-]{10,}|[A-Fa-f0-9]{32,}|[A-Za-z0-9+/_-]{40,}={0,2})\b')
+
+
+def anonymize_text(text):
+    """
+    E-mail címek, IP címek és token-szerű karaktersorok kitakarása
+
+    :param text: Eredeti szöveg
+    :return: Kitakart szöveg
+    """
+    text = EMAIL_RE.sub('<email>', text)
+    text = IP_RE.sub('<ip>', text)
+    return SECRET_RE.sub('<secret>', text)
+
+
+class QueryLog:
+    """
+    Anonimizált lekérdezés napló JSONL formátumban
+
+    Az írás a naplózáshoz hasonlóan sorba kerül, a fájlba egy háttérszál ír,
+    így a kérést kiszolgáló szálat nem terheli fájl I/O.
+    A rekordok formátuma megegyezik a benchmarks/replay_queries.py bemenetével.
+    """
+    def __init__(self, path):
+        """
+        :param path: A JSONL napló fájl útvonala
+        """
+        self.path = path
+        self._logger = logging.Logger(f"query_log.{path}")
+        self._logger.propagate = False
+        file_handler = logging.FileHandler(path, mode='a', encoding='utf8')
+        file_handler.setFormatter(logging.Formatter('%(message)s'))
+        log_queue = queue.SimpleQueue()
+        self._listener = QueueListener(log_queue, file_handler)
+        self._listener.start()
+        self._logger.addHandler(QueueHandler(log_queue))
+        self._lock = threading.Lock()
+        self.written = 0
+        atexit.register(self.close)
+
+    def record(self, question, status, timings=None, retrieved_files=None, response_chars=None, degraded=False,
+               project=None, retrieval_cached=None):
+        """
+        Egy /ask kérés rögzítése
+
+        :param question: A feltett kérdés (anonimizálva kerül a naplóba)
+        :param status: HTTP státuszkód
+        :param timings: Szakaszonkénti idők másodpercben
+        :param retrieved_files: A visszakeresett fájlok relatív útjai
+        :param response_chars: A válasz hossza karakterben
+        :param degraded: Csak keresési találatokat adott-e vissza
+        :param project: A kérdezett projekt (None: alapértelmezett projekt)
+        :param retrieval_cached: A keresés előtöltött eredményből jött-e
+        """
+        self._logger.info(json.dumps({
+            "ts": round(time.time(), 3),
+            "question": anonymize_text(question),
+            "status": status,
+            "timings": timings or {},
+            "retrieved_files": retrieved_files or [],
+            "response_chars": response_chars,
+            "degraded": degraded,
+            "project": project,
+            "retrieval_cached": retrieval_cached
+        }, ensure_ascii=False))
+        with self._lock:
+            self.written += 1
+
+    def close(self):
+        """
+        A háttérszál leállítása a függő rekordok kiírása után
+        """
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
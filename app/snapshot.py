@@ -0,0 +1,199 @@
+"""
+Hordozható index pillanatképek (snapshot) írása és olvasása
+
+Fájlformátum: gzip tömörített JSON sorok. Az első sor a fejléc (formátum,
+verzió, ujjlenyomat, darabszám, kihagyott fájlok), minden további sor egy
+chunk azonosítóval, szöveggel, metaadatokkal és base64 kódolt float32
+embeddinggel.
+
+Parancssori használat:
+    python app/snapshot.py export index.snapshot.gz
+    python app/snapshot.py export index.snapshot.gz --db-dir /var/lib/rag/chroma --project billing
+    python app/snapshot.py import index.snapshot.gz --db-dir /var/lib/rag/chroma
+    DB_DIR=/var/lib/rag/chroma python app/main.py
+
+A --db-dir a szerver projekt adatbázisainak gyökere; a projekt indexe
+a <db-dir>/<projekt> könyvtár project_<projekt> collectionje, ahogy a
+ProjectRegistry is megnyitja.
+"""
+import os
+import sys
+import json
+import gzip
+import time
+import base64
+import hashlib
+import argparse
+from array import array
+
+SNAPSHOT_FORMAT = "rag-index-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(Exception):
+    """
+    Érvénytelen vagy nem kompatibilis pillanatkép
+    """
+
+
+def fingerprint_hash(fingerprint):
+    """
+    Ujjlenyomat szótár stabil hash-e
+
+    :param fingerprint: Modell és chunkoló beállítások szótára
+    :return: Hexadecimális sha256 hash
+    """
+    payload = json.dumps(fingerprint, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf8')).hexdigest()
+
+
+def encode_embedding(embedding):
+    return base64.b64encode(array('f', embedding).tobytes()).decode('ascii')
+
+
+def decode_embedding(encoded, byteorder):
+    values = array('f')
+    values.frombytes(base64.b64decode(encoded))
+    if byteorder != sys.byteorder:
+        values.byteswap()
+    return values.tolist()
+
+
+def write_snapshot(path, fingerprint, records, count, unreadable_files=None):
+    """
+    Pillanatkép írása atomikusan (ideiglenes fájl, majd átnevezés)
+
+    :param path: Cél fájl útvonala
+    :param fingerprint: Modell és chunkoló ujjlenyomat
+    :param records: (id, document, metadata, embedding) elemek iterátora
+    :param count: A rekordok várható száma
+    :param unreadable_files: Az indexeléskor kihagyott fájlok jegyzéke (relatív út -> adatok)
+    :return: A kiírt rekordok száma
+    """
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.time(),
+        "byteorder": sys.byteorder,
+        "fingerprint": fingerprint,
+        "fingerprint_hash": fingerprint_hash(fingerprint),
+        "count": count,
+        "unreadable_files": unreadable_files or {},
+    }
+    tmp_path = f"{path}.tmp"
+    written = 0
+    try:
+        with gzip.open(tmp_path, 'wt', encoding='utf8', compresslevel=6) as f:
+            f.write(json.dumps(header) + "\n")
+            for record_id, document, metadata, embedding in records:
+                f.write(json.dumps({
+                    "id": record_id,
+                    "document": document,
+                    "metadata": metadata,
+                    "embedding": encode_embedding(embedding),
+                }, ensure_ascii=False) + "\n")
+                written += 1
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return written
+
+
+def read_snapshot(path, expected_fingerprint):
+    """
+    Pillanatkép megnyitása és fejlécének ellenőrzése
+
+    :param path: Pillanatkép fájl útvonala
+    :param expected_fingerprint: Az aktuális modell és chunkoló ujjlenyomata
+    :return: (fejléc, rekord iterátor) pár; a rekordok (id, document, metadata, embedding)
+    :raises SnapshotError: Ismeretlen formátum, verzió vagy eltérő ujjlenyomat esetén
+    """
+    f = gzip.open(path, 'rt', encoding='utf8')
+    try:
+        header = json.loads(f.readline())
+    except (OSError, ValueError) as e:
+        f.close()
+        raise SnapshotError(f"Olvashatatlan pillanatkép fejléc: {e}")
+
+    try:
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise SnapshotError(f"Ismeretlen pillanatkép formátum: {header.get('format')}")
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Nem támogatott pillanatkép verzió: {header.get('version')}")
+        if header.get("fingerprint_hash") != fingerprint_hash(expected_fingerprint):
+            raise SnapshotError(
+                f"A pillanatkép ujjlenyomata eltér: {header.get('fingerprint')} != {expected_fingerprint}"
+            )
+    except SnapshotError:
+        f.close()
+        raise
+
+    byteorder = header.get("byteorder", "little")
+
+    def records():
+        with f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                yield (
+                    record["id"],
+                    record["document"],
+                    record["metadata"],
+                    decode_embedding(record["embedding"], byteorder),
+                )
+
+    return header, records()
+
+
+def main():
+    # Az app könyvtár hozzáadása a Python útvonalhoz
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.append(current_dir)
+    from database import DocumentDatabase
+    from projects import PROJECT_NAME_RE, project_collection_name, project_db_dir
+
+    parser = argparse.ArgumentParser(description="Index pillanatkép exportálása és importálása")
+    parser.add_argument('command', choices=['export', 'import'], help="Végrehajtandó művelet")
+    parser.add_argument('path', help="Pillanatkép fájl útvonala")
+    parser.add_argument('--source-dir', default=os.path.join(os.path.dirname(current_dir), 'data'),
+                        help="Forrás dokumentumok könyvtára")
+    parser.add_argument('--db-dir', default=None,
+                        help="A projekt adatbázisok gyökérkönyvtára, mint a szerveren "
+                             "(export esetén hiányában ideiglenes index épül)")
+    parser.add_argument('--project', default='default',
+                        help="Projekt név; az index a <db-dir>/<projekt> könyvtár project_<projekt> collectionje")
+    args = parser.parse_args()
+
+    if not PROJECT_NAME_RE.match(args.project):
+        print(f"Érvénytelen projekt név: {args.project}", file=sys.stderr)
+        return 1
+    if args.command == 'import' and not args.db_dir:
+        print("Importáláshoz meg kell adni a --db-dir könyvtárat (a szerver DB_DIR beállítása)", file=sys.stderr)
+        return 1
+    db_root = args.db_dir or os.path.join('/tmp', f'chroma_db_snapshot_{int(time.time())}')
+    db_dir = project_db_dir(db_root, args.project)
+    document_db = DocumentDatabase(args.source_dir, db_dir,
+                                   collection_name=project_collection_name(args.project))
+
+    if args.command == 'export':
+        if not args.db_dir and not document_db.setup_database():
+            print("Az index felépítése sikertelen", file=sys.stderr)
+            return 1
+        count = document_db.export_snapshot(args.path)
+        if count is None:
+            print("Az exportálás sikertelen", file=sys.stderr)
+            return 1
+        print(f"{count} chunk exportálva: {args.path}")
+        return 0
+
+    if not document_db.import_snapshot(args.path):
+        print("Az importálás sikertelen", file=sys.stderr)
+        return 1
+    print(f"Pillanatkép importálva: {db_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
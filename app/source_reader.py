@@ -0,0 +1,108 @@
+import mmap
+import codecs
+
+# A bináris tartalom felismeréséhez vizsgált kezdő bájtok száma
+BINARY_SNIFF_BYTES = 8192
+# Ennél nagyobb arányú vezérlőkarakter esetén a tartalom binárisnak számít
+BINARY_CONTROL_RATIO = 0.3
+# Szövegben megengedett vezérlőkarakterek (tab, soremelés, lapdobás, kocsivissza, escape)
+TEXT_CONTROL_BYTES = {0x08, 0x09, 0x0a, 0x0c, 0x0d, 0x1b}
+
+
+class UnreadableSource(Exception):
+    """
+    Kihagyandó forrásfájl; az üzenet a kihagyás oka
+    """
+
+
+def looks_binary(sample):
+    """
+    Bináris tartalom felismerése a fájl elejéből
+
+    NUL bájt vagy túl sok vezérlőkarakter esetén binárisnak tekinti.
+    A kódolást nem vizsgálja: a nem UTF-8 szöveget a hívó külön jelzi.
+
+    :param sample: A fájl első bájtjai
+    :return: True ha a tartalom nem szöveg
+    """
+    if not sample:
+        return False
+    if b'\0' in sample:
+        return True
+    control = sum(1 for byte in sample if byte < 0x20 and byte not in TEXT_CONTROL_BYTES)
+    if control / len(sample) > BINARY_CONTROL_RATIO:
+        return True
+    return False
+
+
+def read_text(path):
+    """
+    Kis fájl beolvasása egyben, bináris ellenőrzéssel
+
+    :param path: Fájl útvonala
+    :return: A fájl szövege
+    :raises UnreadableSource: Bináris vagy nem UTF-8 tartalom esetén
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if looks_binary(data[:BINARY_SNIFF_BYTES]):
+        raise UnreadableSource('bináris')
+    try:
+        return data.decode('utf8')
+    except UnicodeDecodeError:
+        raise UnreadableSource('nem UTF-8')
+
+
+def iter_text_pieces(path, piece_bytes, overlap_chars=0):
+    """
+    Nagy fájl olvasása darabokban, lehetőleg memóriába leképezve
+
+    A darabok sorhatáron törnek (ha a darabban van soremelés), és mindegyik
+    az előző darab utolsó overlap_chars karakterével kezdődik, így a darabok
+    határán sem vész el kontextus a chunkolásnál. A fájl elejét a read_text-tel
+    azonos módon ellenőrzi; a további érvénytelen UTF-8 sorozatok cserekarakterre
+    változnak, mert ekkor a korábbi darabok már feldolgozásra kerültek.
+
+    :param path: Fájl útvonala
+    :param piece_bytes: Egy darab legnagyobb mérete bájtban
+    :param overlap_chars: Az előző darabból átvett karakterek száma
+    :return: Generátor: (darab sorszáma, szöveg)
+    :raises UnreadableSource: Ha a fájl eleje bináris vagy nem UTF-8
+    """
+    with open(path, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Üres vagy leképezhetetlen fájl (pl. speciális fájlrendszer)
+            buffer = None
+        try:
+            data = buffer if buffer is not None else f.read()
+            sample = data[:BINARY_SNIFF_BYTES]
+            if looks_binary(sample):
+                raise UnreadableSource('bináris')
+            try:
+                codecs.getincrementaldecoder('utf8')().decode(sample, final=False)
+            except UnicodeDecodeError:
+                raise UnreadableSource('nem UTF-8')
+
+            decoder = codecs.getincrementaldecoder('utf8')(errors='replace')
+            size = len(data)
+            position = 0
+            index = 0
+            tail = ''
+            while position < size:
+                end = min(position + piece_bytes, size)
+                if end < size:
+                    newline = data.rfind(b'\n', position, end)
+                    if newline > position:
+                        end = newline + 1
+                text = decoder.decode(data[position:end], final=end >= size)
+                position = end
+                if not text:
+                    continue
+                yield index, tail + text
+                index += 1
+                tail = text[-overlap_chars:] if overlap_chars else ''
+        finally:
+            if buffer is not None:
+                buffer.close()
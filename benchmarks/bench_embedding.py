@@ -0,0 +1,69 @@
+"""
+Beágyazási benchmark: egyprocesszes és többprocesszes mód összehasonlítása
+
+Használat:
+    python benchmarks/bench_embedding.py --chunks 4000 --processes 2 4 8
+"""
+import os
+import sys
+import time
+import argparse
+
+# Az app könyvtár hozzáadása a Python útvonalhoz
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from database import HuggingFaceEmbeddingsAdapter, EMBEDDING_MODEL_NAME, EMBEDDING_BATCH_SIZE
+
+
+def make_chunks(count):
+    """
+    Java forráskódra hasonlító, determinisztikus teszt chunkok előállítása
+
+    :param count: Chunkok száma
+    :return: Chunk szövegek listája
+    """
+    template = (
+        "public class Service{i} implements Repository<Entity{i}> {{\n"
+        "    private final Logger logger = LoggerFactory.getLogger(Service{i}.class);\n"
+        "    public Optional<Entity{i}> findById(Long id) {{\n"
+        "        logger.debug(\"findById {{}}\", id);\n"
+        "        return repository.findById(id).map(this::enrich{i});\n"
+        "    }}\n"
+        "}}\n"
+    )
+    return [template.format(i=i) * 4 for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Beágyazási benchmark")
+    parser.add_argument('--chunks', type=int, default=2000, help="Beágyazandó chunkok száma")
+    parser.add_argument('--processes', type=int, nargs='+', default=[2, 4], help="Vizsgált worker processz számok")
+    parser.add_argument('--batch-size', type=int, default=EMBEDDING_BATCH_SIZE, help="Encode csomagméret")
+    args = parser.parse_args()
+
+    texts = make_chunks(args.chunks)
+    adapter = HuggingFaceEmbeddingsAdapter(model_name=EMBEDDING_MODEL_NAME)
+
+    # Bemelegítés, hogy a modell betöltése ne torzítsa a mérést
+    adapter.embed_documents(texts[:8], batch_size=args.batch_size)
+
+    start = time.perf_counter()
+    baseline = adapter.embed_documents(texts, batch_size=args.batch_size)
+    single_seconds = time.perf_counter() - start
+    print(f"1 processz: {single_seconds:.2f} mp ({len(texts) / single_seconds:.1f} chunk/mp)")
+
+    for processes in args.processes:
+        start = time.perf_counter()
+        embeddings = adapter.embed_documents_multiprocess(texts, processes, batch_size=args.batch_size)
+        seconds = time.perf_counter() - start
+        same_order = len(embeddings) == len(baseline) and all(
+            abs(a[0] - b[0]) < 1e-4 for a, b in zip(embeddings, baseline)
+        )
+        print(
+            f"{processes} processz: {seconds:.2f} mp ({len(texts) / seconds:.1f} chunk/mp), "
+            f"gyorsulás: {single_seconds / seconds:.2f}x, sorrend egyezik: {same_order}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Naplózási többletköltség egy /ask kérésre: régi (szinkron) és új (sorba pufferelt) beállítás
+
+A régi beállítás a kérést kiszolgáló szálon ír fájlba és konzolra DEBUG
+szinten, és minden találatot, fájlt és a teljes kérdést naplózza. Az új
+beállítás a configure_logging() sorát használja, a részletes üzenetek
+DEBUG szintre kerültek. Mindkét esetben a konzol kimenet /dev/null.
+
+Használat:
+    python benchmarks/bench_logging.py --requests 2000
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+
+# Az app könyvtár hozzáadása a Python útvonalhoz
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from logging_setup import configure_logging, shutdown_logging
+
+QUESTION = "Hogyan kezeli az OrderService a tranzakciókat a fizetési folyamatban?"
+HITS = [f"src/main/java/com/acme/order/OrderService{i}.java" for i in range(5)]
+
+
+def simulate_legacy_ask(main_logger, db_logger, llm_logger):
+    main_logger.info(f"Beérkező kérdés: '{QUESTION}'")
+    db_logger.info(f"Hasonlósági keresés indítása: '{QUESTION}'")
+    db_logger.info("Collection sikeresen lekérve a kereséshez")
+    for i, path in enumerate(HITS):
+        db_logger.info(f"Találat {i+1} (távolság: {0.1 * i:.4f}): {path}")
+    db_logger.info(f"Összesen {len(HITS)} találat visszaadva")
+    llm_logger.info(f"{len(HITS)} dokumentum használata kontextusként")
+    llm_logger.info(f"Válasz generálása a következő kérdésre: '{QUESTION}'")
+    llm_logger.info("Válasz sikeresen generálva")
+    main_logger.info("Válasz sikeresen legenerálva (1234 karakter)")
+
+
+def simulate_current_ask(main_logger, db_logger, llm_logger):
+    main_logger.info(f"Beérkező kérdés ({len(QUESTION)} karakter)")
+    main_logger.debug(f"Kérdés szövege: '{QUESTION}'")
+    db_logger.debug(f"Hasonlósági keresés indítása: '{QUESTION}'")
+    db_logger.debug("Collection sikeresen lekérve a kereséshez")
+    if db_logger.isEnabledFor(logging.DEBUG):
+        for i, path in enumerate(HITS):
+            db_logger.debug(f"Találat {i+1} (távolság: {0.1 * i:.4f}): {path}")
+    db_logger.debug(f"Összesen {len(HITS)} találat visszaadva")
+    llm_logger.debug(f"{len(HITS)} dokumentum használata kontextusként")
+    llm_logger.debug(f"Válasz generálása a következő kérdésre: '{QUESTION}'")
+    llm_logger.debug("Válasz sikeresen generálva")
+    main_logger.info("Válasz sikeresen legenerálva (1234 karakter)")
+
+
+def loggers():
+    return logging.getLogger('main'), logging.getLogger('database'), logging.getLogger('llm_service')
+
+
+def run(simulate, count):
+    main_logger, db_logger, llm_logger = loggers()
+    start = time.perf_counter()
+    for _ in range(count):
+        simulate(main_logger, db_logger, llm_logger)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Naplózási többletköltség mérése")
+    parser.add_argument('--requests', type=int, default=2000, help="Szimulált /ask kérések száma")
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, 'w')
+    with tempfile.TemporaryDirectory() as log_dir:
+        # Régi beállítás: basicConfig DEBUG szinten, példányonként külön konzol handler
+        logging.basicConfig(level=logging.DEBUG, filename=os.path.join(log_dir, 'legacy.log'), filemode='a',
+                            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        for logger in loggers():
+            logger.addHandler(logging.StreamHandler(devnull))
+        legacy_us = run(simulate_legacy_ask, args.requests)
+
+        # Visszaállítás
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+        for logger in loggers():
+            logger.handlers.clear()
+
+        # Új beállítás
+        configure_logging(log_dir, stream=devnull)
+        current_us = run(simulate_current_ask, args.requests)
+        shutdown_logging()
+
+    print(f"Régi naplózás:  {legacy_us:8.1f} µs / kérés (a kérés szálán)")
+    print(f"Új naplózás:    {current_us:8.1f} µs / kérés (a kérés szálán)")
+    print(f"Megtakarítás:   {legacy_us - current_us:8.1f} µs / kérés ({legacy_us / current_us:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Keresési benchmark: csak vektoros és hibrid (lexikális + vektoros) keresés összehasonlítása
+
+A szimbólum lekérdezéseket az indexből mintázza: olyan kódszimbólumokat
+választ, amelyek kevés fájlban szerepelnek, és találatnak azt tekinti, ha
+a top-k eredmény között van olyan fájl, amelyben a szimbólum előfordul.
+Opcionálisan saját lekérdezések is megadhatók (egy sor, egy kérdés); ezeknél
+csak a késleltetést méri.
+
+Használat:
+    python benchmarks/bench_retrieval.py --source-dir data --symbols 200 --k 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+# Az app könyvtár hozzáadása a Python útvonalhoz
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from database import DocumentDatabase
+from lexical_index import IDENTIFIER_RE, is_symbol
+
+
+def sample_symbol_queries(lexical_index, count, max_files=3, seed=13):
+    """
+    Ritka kódszimbólumok és az őket tartalmazó fájlok mintavételezése
+
+    :return: (szimbólum, elvárt fájlok halmaza) párok listája
+    """
+    occurrences = {}
+    for _, text, metadata in lexical_index.documents:
+        for match in IDENTIFIER_RE.finditer(text):
+            identifier = match.group(0)
+            if is_symbol(identifier) and len(identifier) > 3:
+                occurrences.setdefault(identifier, set()).add(metadata.get('filepath'))
+    candidates = [(symbol, files) for symbol, files in occurrences.items() if len(files) <= max_files]
+    random.Random(seed).shuffle(candidates)
+    return candidates[:count]
+
+
+def measure(document_db, queries, k, mode):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        hits = document_db.search([query], k=k, mode=mode)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(hits)
+    return latencies, results
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keresési benchmark")
+    parser.add_argument('--source-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+    parser.add_argument('--symbols', type=int, default=200, help="Mintavételezett szimbólum lekérdezések száma")
+    parser.add_argument('--queries-file', help="Saját lekérdezések fájlja (soronként egy)")
+    parser.add_argument('--k', type=int, default=5)
+    args = parser.parse_args()
+
+    db_dir = os.path.join('/tmp', f'chroma_db_bench_{int(time.time())}')
+    document_db = DocumentDatabase(args.source_dir, db_dir)
+    if not document_db.setup_database():
+        print("Az index felépítése sikertelen", file=sys.stderr)
+        return 1
+
+    symbol_queries = sample_symbol_queries(document_db.lexical_index, args.symbols)
+    query_sets = [("szimbólum", [symbol for symbol, _ in symbol_queries], [files for _, files in symbol_queries])]
+    if args.queries_file:
+        with open(args.queries_file, encoding='utf8') as f:
+            free_text = [line.strip() for line in f if line.strip()]
+        query_sets.append(("szabad szöveg", free_text, None))
+
+    # Bemelegítés
+    document_db.search(["warmup"], k=args.k, mode='vector')
+
+    for name, queries, expected in query_sets:
+        if not queries:
+            continue
+        print(f"\n{name} lekérdezések ({len(queries)} db, k={args.k})")
+        for mode in ('vector', 'hybrid'):
+            latencies, results = measure(document_db, queries, args.k, mode)
+            line = (f"  {mode:7s} p50: {statistics.median(latencies):7.2f} ms  "
+                    f"p95: {percentile(latencies, 95):7.2f} ms")
+            if expected is not None:
+                hits = sum(
+                    1 for hits_for_query, files in zip(results, expected)
+                    if any(hit['metadata'].get('filepath') in files for hit in hits_for_query)
+                )
+                line += f"  hit@{args.k}: {hits / len(queries):.3f}"
+            print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
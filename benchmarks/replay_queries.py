@@ -0,0 +1,157 @@
+"""
+Lekérdezés napló visszajátszása egy futó példány ellen
+
+A QUERY_LOG_PATH által írt JSONL napló kérdéseit küldi a /ask végpontra
+megadott ütemben és párhuzamossággal, majd áteresztőképességet és
+késleltetési percentiliseket jelent. Az LLM költségének kizárásához a
+szervert LLM_BACKEND=fake beállítással érdemes indítani:
+
+    LLM_BACKEND=fake FAKE_LLM_LATENCY_MS=800 QUERY_LOG_PATH=logs/queries.jsonl python app/main.py
+    python benchmarks/replay_queries.py logs/queries.jsonl --rate 20 --concurrency 16
+
+Megadott ütemnél a terhelés nyílt ciklusú: a kérések az ütemezett időpontban
+indulnak, a késleltetés az ütemezett időponttól számít (a kliens oldali
+várakozás is benne van). Ha a --concurrency keret betelt, a kérés nem indul
+el, hanem eldobottként számít; a 0 ütem zárt ciklusú (keretre váró) futás.
+
+A napló minden "question" mezőt tartalmazó sorát felhasználja, a többit kihagyja.
+Ha a sor "project" mezőt is tartalmaz, a kérés ugyanarra a projektre megy.
+"""
+import sys
+import json
+import time
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Ennél később induló kérés késettnek számít (mp)
+LATE_TOLERANCE_SECONDS = 0.05
+
+
+def load_questions(path, limit=None):
+    """
+    Kérdések beolvasása a JSONL naplóból
+
+    :param path: Napló fájl útvonala
+    :param limit: Legfeljebb ennyi kérdés
+    :return: (kérdés, projekt) párok listája a naplóbeli sorrendben
+    """
+    questions = []
+    with open(path, encoding='utf8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get('question'):
+                questions.append((record['question'], record.get('project')))
+                if limit and len(questions) >= limit:
+                    break
+    return questions
+
+
+def send_question(url, question, project, timeout, scheduled=None):
+    """
+    Egy kérdés elküldése
+
+    :param scheduled: Az ütemezett indulás time.perf_counter() szerint (None: a tényleges küldés)
+    :return: (HTTP státusz vagy hiba neve, késleltetés mp-ben, degradált-e)
+    """
+    fields = {"question": question}
+    if project:
+        fields["project"] = project
+    body = json.dumps(fields).encode('utf8')
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    start = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            payload = json.loads(resp.read() or b'{}')
+            return resp.status, time.perf_counter() - start, bool(payload.get('degraded'))
+    except urllib.error.HTTPError as e:
+        return e.code, time.perf_counter() - start, False
+    except Exception as e:
+        return type(e).__name__, time.perf_counter() - start, False
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lekérdezés napló visszajátszása")
+    parser.add_argument('log', help="JSONL lekérdezés napló")
+    parser.add_argument('--url', default='http://localhost:8080/ask', help="A /ask végpont URL-je")
+    parser.add_argument('--rate', type=float, default=10.0, help="Indított kérés / mp (0: amilyen gyorsan lehet)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Egyidejű kérések legnagyobb száma (felette a kérés eldobódik)")
+    parser.add_argument('--limit', type=int, default=None, help="Legfeljebb ennyi kérdés visszajátszása")
+    parser.add_argument('--loops', type=int, default=1, help="A napló ismétléseinek száma")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Kérésenkénti időkorlát (mp)")
+    args = parser.parse_args()
+
+    questions = load_questions(args.log, args.limit) * args.loops
+    if not questions:
+        print("A napló nem tartalmaz kérdést", file=sys.stderr)
+        return 1
+
+    results = []
+    results_lock = threading.Lock()
+    slots = threading.BoundedSemaphore(args.concurrency)
+    dropped = 0
+    late = 0
+
+    def run(question, project, scheduled):
+        try:
+            outcome = send_question(args.url, question, project, args.timeout, scheduled)
+            with results_lock:
+                results.append(outcome)
+        finally:
+            slots.release()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for i, (question, project) in enumerate(questions):
+            if args.rate <= 0:
+                slots.acquire()
+                executor.submit(run, question, project, None)
+                continue
+            # Nyílt ciklusú ütemezés: az ütem nem függ a szerver válaszidejétől
+            scheduled = start + i / args.rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif -delay > LATE_TOLERANCE_SECONDS:
+                late += 1
+            if not slots.acquire(blocking=False):
+                dropped += 1
+                continue
+            executor.submit(run, question, project, scheduled)
+    elapsed = time.perf_counter() - start
+
+    statuses = Counter(status for status, _, _ in results)
+    ok_latencies = [latency for status, latency, _ in results if status == 200]
+    degraded = sum(1 for status, _, is_degraded in results if status == 200 and is_degraded)
+
+    print(f"Elküldött kérések: {len(results)} ({elapsed:.1f} mp alatt)")
+    if args.rate > 0:
+        print(f"Eldobott (teli --concurrency keret): {dropped}, késve indult: {late}")
+    print(f"Áteresztőképesség: {len(results) / elapsed:.2f} kérés/mp, sikeres: {len(ok_latencies) / elapsed:.2f} kérés/mp")
+    print(f"Státuszok: {dict(statuses)}, ebből degradált: {degraded}")
+    if ok_latencies:
+        print(
+            "Késleltetés (sikeres, ms" + (", az ütemezett indulástól" if args.rate > 0 else "") + "): "
+            f"p50 {percentile(ok_latencies, 50) * 1000:.0f}  "
+            f"p90 {percentile(ok_latencies, 90) * 1000:.0f}  "
+            f"p99 {percentile(ok_latencies, 99) * 1000:.0f}  "
+            f"max {max(ok_latencies) * 1000:.0f}"
+        )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
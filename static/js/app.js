@@ -1,3 +1,9 @@
+// Gépelés közbeni előtöltés: várakozás az utolsó billentyű után (ms) és a legrövidebb kérdés
+const PREFETCH_DEBOUNCE_MS = 400;
+const PREFETCH_MIN_CHARS = 8;
+let prefetchTimer = null;
+let prefetchController = null;
+
 // Naplózás beállítása
 function log(message, level = 'info') {
     const timestamp = new Date().toISOString();
@@ -128,8 +134,9 @@ function askQuestion() {
     // Görgetés a chat végére
     document.getElementById('chat-messages').scrollTop = document.getElementById('chat-messages').scrollHeight;
     
-    // Input mező kiürítése
+    // Input mező és előtöltés előnézet kiürítése
     document.getElementById('user-input').value = '';
+    cancelPrefetch();
 
     fetch('/ask', {
         method: 'POST',
@@ -176,6 +183,60 @@ function askQuestion() {
     });
 }
 
+// Keresés előtöltése gépelés közben, hogy a beküldött kérdésnél már ne kelljen rá várni
+function schedulePrefetch() {
+    cancelPrefetch();
+    const question = document.getElementById('user-input').value.trim();
+    if (question.length < PREFETCH_MIN_CHARS) {
+        return;
+    }
+    prefetchTimer = setTimeout(() => prefetchQuestion(question), PREFETCH_DEBOUNCE_MS);
+}
+
+function prefetchQuestion(question) {
+    prefetchTimer = null;
+    prefetchController = new AbortController();
+    fetch('/prefetch', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ question: question }),
+        signal: prefetchController.signal,
+    })
+    .then(response => response.json())
+    .then(data => {
+        prefetchController = null;
+        if (data.status === 'success') {
+            displayPrefetchPreview(data.files);
+        } else {
+            log(`Előtöltési hiba: ${data.message}`, 'warn');
+        }
+    })
+    .catch(error => {
+        if (error.name !== 'AbortError') {
+            log(`Hiba az előtöltés közben: ${error}`, 'warn');
+        }
+    });
+}
+
+function cancelPrefetch() {
+    if (prefetchTimer !== null) {
+        clearTimeout(prefetchTimer);
+        prefetchTimer = null;
+    }
+    if (prefetchController !== null) {
+        prefetchController.abort();
+        prefetchController = null;
+    }
+    document.getElementById('prefetch-preview').textContent = '';
+}
+
+function displayPrefetchPreview(files) {
+    const preview = document.getElementById('prefetch-preview');
+    preview.textContent = files.length > 0 ? `Releváns fájlok: ${files.join(', ')}` : '';
+}
+
 // Segédfüggvények
 function showMessage(message, type) {
     const messageElement = document.getElementById('message');
@@ -296,6 +357,9 @@ document.addEventListener('DOMContentLoaded', () => {
     document.getElementById('list-documents').addEventListener('click', listDocuments);
     document.getElementById('send-btn').addEventListener('click', askQuestion);
     
+    // Előtöltés gépelés közben
+    document.getElementById('user-input').addEventListener('input', schedulePrefetch);
+    
     // Enter billentyű kezelése
     document.getElementById('user-input').addEventListener('keypress', function(e) {
         if (e.key === 'Enter') {
@@ -0,0 +1,63 @@
+import os
+import sys
+import hashlib
+
+import pytest
+
+# Az alkalmazás modulok egymást a könyvtárukból, csomag nélkül importálják
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+EMBEDDING_DIMENSION = 8
+
+
+class _DimensionModel:
+    def get_sentence_embedding_dimension(self):
+        return EMBEDDING_DIMENSION
+
+
+class HashEmbeddings:
+    """
+    Determinisztikus, modell nélküli beágyazás a tesztekhez
+    """
+    model_name = 'test-hash'
+
+    def __init__(self):
+        self.model = _DimensionModel()
+        # A beágyazott dokumentum szövegek száma (újraépítés felismeréséhez)
+        self.embedded_documents = 0
+
+    def _embed(self, text):
+        digest = hashlib.sha256(text.encode('utf8')).digest()
+        return [byte / 255 for byte in digest[:EMBEDDING_DIMENSION]]
+
+    def embed_documents(self, texts, batch_size=None):
+        self.embedded_documents += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_documents_multiprocess(self, texts, processes, batch_size=None):
+        return self.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+    def embed_queries(self, texts):
+        return [self._embed(text) for text in texts]
+
+
+@pytest.fixture(scope='session', autouse=True)
+def _logging(tmp_path_factory):
+    # A projekt logs könyvtára helyett ideiglenes könyvtárba naplózunk
+    from logging_setup import configure_logging
+    configure_logging(log_dir=str(tmp_path_factory.mktemp('logs')))
+
+
+@pytest.fixture
+def embeddings():
+    return HashEmbeddings()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # A DocumentDatabase a munkakönyvtárba naplóz
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
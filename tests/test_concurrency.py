@@ -0,0 +1,108 @@
+import time
+import threading
+
+import pytest
+
+from concurrency import AdmissionController, AdmissionRejected, DeadlineExceeded, SingleFlight
+
+
+def test_admission_rejects_when_queue_full():
+    controller = AdmissionController(max_concurrent=1, max_queue=0, retry_after=2)
+    controller.acquire()
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        controller.acquire()
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after == 2
+
+    controller.release()
+    controller.acquire()
+    controller.release()
+    assert controller.stats()["rejected_queue_full"] == 1
+
+
+def test_admission_waiter_times_out_at_deadline():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, retry_after=1)
+    controller.acquire()
+
+    start = time.monotonic()
+    with pytest.raises(AdmissionRejected) as excinfo:
+        controller.acquire(deadline=start + 0.1)
+    assert excinfo.value.status_code == 503
+    assert 0.1 <= time.monotonic() - start < 1
+
+    stats = controller.stats()
+    assert stats["rejected_deadline"] == 1
+    assert stats["waiting"] == 0
+
+
+def test_admission_waiter_admitted_on_release():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, retry_after=1)
+    controller.acquire()
+    admitted = threading.Event()
+
+    def waiter():
+        controller.acquire(deadline=time.monotonic() + 5)
+        admitted.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.05)
+    assert not admitted.is_set()
+    controller.release()
+    thread.join(5)
+    assert admitted.is_set()
+    assert controller.stats()["active"] == 1
+
+
+def _start_leader(flight, key, release):
+    started = threading.Event()
+    results = []
+
+    def leader():
+        started.set()
+        results.append(flight.do(key, lambda: release.wait(5) and 'kész'))
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    started.wait(5)
+    time.sleep(0.05)
+    return thread, results
+
+
+def test_single_flight_follower_shares_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    thread, results = _start_leader(flight, 'k', release)
+
+    follower = []
+    follower_thread = threading.Thread(target=lambda: follower.append(flight.do('k', lambda: 'másik')))
+    follower_thread.start()
+    time.sleep(0.05)
+    release.set()
+    thread.join(5)
+    follower_thread.join(5)
+
+    assert results == ['kész']
+    assert follower == ['kész']
+    assert flight.stats()["executed"] == 1
+    assert flight.stats()["coalesced"] == 1
+
+
+def test_single_flight_follower_deadline():
+    flight = SingleFlight(retry_after=3)
+    release = threading.Event()
+    thread, results = _start_leader(flight, 'k', release)
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded) as excinfo:
+        flight.do('k', lambda: 'másik', deadline=start + 0.1)
+    assert 0.1 <= time.monotonic() - start < 1
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.retry_after == 3
+
+    # A vezető hívás a követő lemondásától függetlenül befejeződik
+    release.set()
+    thread.join(5)
+    assert results == ['kész']
+    assert flight.stats() == {"executed": 1, "coalesced": 1, "timed_out": 1, "in_flight": 0}
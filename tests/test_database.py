@@ -0,0 +1,78 @@
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip('chromadb')
+
+import database
+from database import DocumentDatabase
+
+
+def _write_sources(source_dir):
+    source_dir.mkdir(parents=True)
+    (source_dir / 'README.md').write_text("# Projekt\n\nA UserService a felhasználókat kezeli.\n", encoding='utf8')
+    (source_dir / 'UserService.java').write_text(
+        "public class UserService {\n    public User find(long id) { return null; }\n}\n", encoding='utf8'
+    )
+    # Bináris tartalom szöveges kiterjesztéssel: kihagyott fájl
+    (source_dir / 'data.json').write_bytes(b'\x00\x01\x02' * 100)
+
+
+def test_imported_snapshot_is_not_reembedded_on_another_host(workdir, embeddings):
+    source_dir = workdir / 'build' / 'src'
+    _write_sources(source_dir)
+    builder = DocumentDatabase(str(source_dir), str(workdir / 'build' / 'db'), embeddings=embeddings)
+    assert builder.setup_database()
+    snapshot_path = str(workdir / 'index.snapshot.gz')
+    assert builder.export_snapshot(snapshot_path)
+
+    # Friss checkout: azonos tartalom, eltérő módosítási idők
+    replica_source = workdir / 'replica' / 'src'
+    shutil.copytree(source_dir, replica_source)
+    for name in os.listdir(replica_source):
+        os.utime(replica_source / name, (1_000_000, 1_000_000))
+
+    replica = DocumentDatabase(str(replica_source), str(workdir / 'replica' / 'db'), embeddings=embeddings)
+    assert replica.import_snapshot(snapshot_path)
+    embedded = embeddings.embedded_documents
+    version = replica.index_version
+
+    assert replica.check_and_update_if_needed()
+    assert embeddings.embedded_documents == embedded
+    assert replica.index_version == version
+
+    # Újraindítás DB_DIR-rel: a kihagyott fájlok jegyzéke a lemezről töltődik
+    restarted = DocumentDatabase(str(replica_source), str(workdir / 'replica' / 'db'), embeddings=embeddings)
+    assert restarted.check_and_update_if_needed()
+    assert embeddings.embedded_documents == embedded
+
+    # Tartalmi változás továbbra is újraépítést okoz
+    (replica_source / 'README.md').write_text("# Projekt\n\nMódosított leírás.\n", encoding='utf8')
+    os.utime(replica_source / 'README.md', (1_000_000, 1_000_000))
+    restarted.scanner.invalidate()
+    assert restarted.check_and_update_if_needed()
+    assert embeddings.embedded_documents > embedded
+
+
+def test_read_error_is_not_rebuilt_on_every_open(workdir, embeddings, monkeypatch):
+    source_dir = workdir / 'src'
+    _write_sources(source_dir)
+    locked_path = str(source_dir / 'README.md')
+    read_text = database.read_text
+
+    def failing_read_text(path):
+        if path == locked_path:
+            raise PermissionError(13, 'Permission denied', path)
+        return read_text(path)
+
+    monkeypatch.setattr(database, 'read_text', failing_read_text)
+    document_db = DocumentDatabase(str(source_dir), str(workdir / 'db'), embeddings=embeddings)
+    assert document_db.setup_database()
+    assert {'filepath': 'README.md', 'reason': 'olvasási hiba'} in document_db.last_ingest_stats['skipped_files']
+    embedded = embeddings.embedded_documents
+
+    assert document_db.check_and_update_if_needed()
+    reopened = DocumentDatabase(str(source_dir), str(workdir / 'db'), embeddings=embeddings)
+    assert reopened.check_and_update_if_needed()
+    assert embeddings.embedded_documents == embedded
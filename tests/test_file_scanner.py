@@ -0,0 +1,44 @@
+from file_scanner import IgnoreRules, SourceScanner
+
+
+def _ignored(patterns, relpath, is_dir=False, base_relpath=''):
+    return IgnoreRules(base_relpath, patterns).match(relpath, is_dir)
+
+
+def test_anchored_star_stays_in_one_segment():
+    assert _ignored(['/docs/*.md'], 'docs/a.md')
+    assert _ignored(['/docs/*.md'], 'docs/sub/b.md') is None
+    assert _ignored(['docs/?.md'], 'docs/a.md')
+    assert _ignored(['docs/?.md'], 'docs/ab.md') is None
+
+
+def test_double_star_spans_directories():
+    assert _ignored(['docs/**/*.md'], 'docs/a.md')
+    assert _ignored(['docs/**/*.md'], 'docs/sub/deep/b.md')
+    assert _ignored(['**/build'], 'build', is_dir=True)
+    assert _ignored(['**/build'], 'module/build', is_dir=True)
+    assert _ignored(['generated/**'], 'generated/x/y.java')
+
+
+def test_unanchored_patterns_match_names():
+    assert _ignored(['*.log'], 'a/b/c.log')
+    assert _ignored(['[!a]*.txt'], 'x/bnotes.txt')
+    assert _ignored(['[!a]*.txt'], 'x/anotes.txt') is None
+
+
+def test_negation_and_nested_gitignore():
+    rules = ['*.md', '!README.md']
+    assert _ignored(rules, 'docs/a.md')
+    assert _ignored(rules, 'docs/README.md') is False
+    assert _ignored(['/*.md'], 'sub/a.md', base_relpath='sub')
+    assert _ignored(['/*.md'], 'sub/x/a.md', base_relpath='sub') is None
+
+
+def test_scanner_keeps_files_below_anchored_pattern(tmp_path):
+    (tmp_path / 'docs' / 'sub').mkdir(parents=True)
+    (tmp_path / 'docs' / 'a.md').write_text('a', encoding='utf8')
+    (tmp_path / 'docs' / 'sub' / 'b.md').write_text('b', encoding='utf8')
+    (tmp_path / '.gitignore').write_text('/docs/*.md\n', encoding='utf8')
+
+    scanner = SourceScanner(str(tmp_path), ['md'])
+    assert [f.relpath for f in scanner.scan()] == ['docs/sub/b.md']
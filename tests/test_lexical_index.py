@@ -0,0 +1,36 @@
+from lexical_index import LexicalIndex, identifier_tokens, is_symbol, split_subwords
+
+
+def test_accented_words_stay_whole():
+    assert identifier_tokens('A felhasználó fájl kezelése') == ['a', 'felhasználó', 'fájl', 'kezelése']
+
+
+def test_identifier_parts():
+    assert split_subwords('parseXMLFile') == ['parse', 'XML', 'File']
+    assert split_subwords('SNAKE_CASE') == ['SNAKE', 'CASE']
+    assert split_subwords('felhasználóNév') == ['felhasználó', 'Név']
+    tokens = identifier_tokens('org.acme.UserService')
+    assert tokens[:4] == ['org.acme.userservice', 'org', 'acme', 'userservice']
+    assert 'service' in tokens
+
+
+def test_symbols_are_java_identifiers():
+    assert is_symbol('UserService')
+    assert is_symbol('spring-boot-starter')
+    assert not is_symbol('felhasználó')
+    assert not is_symbol('működik-e')
+
+
+def test_hungarian_symbol_questions_take_fast_path_ratio():
+    index = LexicalIndex.build(['1'], ['public class UserService { }'], [{}])
+    assert index.symbol_ratio('Mit csinál a UserService osztály?') == (0.5, 1)
+    assert index.symbol_ratio('Hogyan működik a UserService?') == (1.0, 1)
+
+
+def test_accented_query_matches_whole_word():
+    index = LexicalIndex.build(
+        ['1', '2'],
+        ['A felhasználó adatai', 'A fájl kezelése'],
+        [{}, {}]
+    )
+    assert [hit[0] for hit in index.search('felhasználó')] == ['1']
@@ -0,0 +1,83 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('langchain_anthropic')
+
+import llm_service
+from llm_service import FakeChatModel, GenerationTimeout, LLMService
+
+
+class _SlowMessagesHandler(BaseHTTPRequestHandler):
+    delay = 0
+    requests = 0
+
+    def do_POST(self):
+        type(self).requests += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.delay)
+        body = json.dumps({
+            "id": "msg_test", "type": "message", "role": "assistant", "model": "test",
+            "content": [{"type": "text", "text": "Kész válasz"}],
+            "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1}
+        }).encode('utf8')
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            # A kliens az időkorlát miatt már bontotta a kapcsolatot
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def anthropic_server(monkeypatch):
+    handler = type('Handler', (_SlowMessagesHandler,), {'delay': 0, 'requests': 0})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv('ANTHROPIC_API_KEY', 'test-key')
+    monkeypatch.setenv('ANTHROPIC_BASE_URL', f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(llm_service, 'LLM_BACKEND', 'anthropic')
+    yield handler
+    server.shutdown()
+    server.server_close()
+
+
+def test_generation_timeout_reaches_api_request(anthropic_server):
+    anthropic_server.delay = 2
+    service = LLMService()
+
+    start = time.monotonic()
+    with pytest.raises(GenerationTimeout):
+        service.generate_response("Mit csinál a UserService?", [], timeout=0.3)
+    assert time.monotonic() - start < 1.5
+    # Újrapróbálás nem sokszorozza a határidőt
+    assert anthropic_server.requests == 1
+
+
+def test_generation_within_timeout(anthropic_server):
+    service = LLMService()
+    assert service.generate_response("Mit csinál a UserService?", [], timeout=5) == "Kész válasz"
+
+
+def test_generation_without_remaining_time_skips_call(anthropic_server):
+    service = LLMService()
+    with pytest.raises(GenerationTimeout):
+        service.generate_response("Mit csinál a UserService?", [], timeout=0)
+    assert anthropic_server.requests == 0
+
+
+def test_fake_model_honours_timeout():
+    with pytest.raises(TimeoutError):
+        FakeChatModel(latency_ms=500).invoke("kérdés", timeout=0.05)
+    assert FakeChatModel(latency_ms=0, response_chars=10).invoke("kérdés").content
@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip('chromadb')
+
+from projects import ProjectRegistry
+
+
+def _registry(workdir, embeddings, memory_budget_bytes):
+    projects = {}
+    for name in ('alpha', 'beta'):
+        source_dir = workdir / 'src' / name
+        source_dir.mkdir(parents=True)
+        (source_dir / 'README.md').write_text(f"# {name}\n\nA {name} projekt leírása.\n", encoding='utf8')
+        projects[name] = str(source_dir)
+    registry = ProjectRegistry(projects, str(workdir / 'db'), 'alpha', memory_budget_bytes)
+    # Modell letöltés helyett a megosztott embedding példány
+    registry._embeddings = embeddings
+    return registry
+
+
+def test_eviction_stops_chroma_system(workdir, embeddings):
+    registry = _registry(workdir, embeddings, memory_budget_bytes=1)
+
+    alpha = registry.get('alpha')
+    assert alpha.chunk_count() > 0
+    alpha_system = alpha.chroma_client._system
+
+    registry.get('beta')
+
+    stats = registry.stats()
+    assert list(stats['open']) == ['beta']
+    assert stats['evicted'] == 1
+    assert alpha.chroma_client is None
+    assert not alpha_system._running
+
+    # Újranyitáskor saját, futó rendszert kap, a lemezen maradt indexszel
+    reopened = registry.get('alpha')
+    assert reopened is not alpha
+    assert reopened.chroma_client._system is not alpha_system
+    assert reopened.chunk_count() > 0
+
+
+def test_eviction_waits_for_running_request(workdir, embeddings):
+    registry = _registry(workdir, embeddings, memory_budget_bytes=1)
+
+    with registry.use('alpha') as alpha:
+        alpha_system = alpha.chroma_client._system
+        registry.get('beta')
+        # Kiürítve, de a futó kérés alatt még használható
+        assert 'alpha' not in registry.stats()['open']
+        assert alpha_system._running
+        assert alpha.chunk_count() > 0
+
+    assert alpha.chroma_client is None
+    assert not alpha_system._running